@@ -0,0 +1,93 @@
+"""
+Startup benchmark - import time, connector config load time and (optionally) API client warm-up time
+
+python bin/benchmark_startup.py example/calendar_connector.yaml
+python bin/benchmark_startup.py example/calendar_connector.yaml --warm-up --gcs-tmpdir gs://{gcs_bucket}/{blob_prefix}/ --ps-subname ...
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_TIMER_SRC = """
+import time
+time_start = time.perf_counter()
+import {module_name}
+print(time.perf_counter() - time_start)
+"""
+
+
+def _summarize(label, timings_secs):
+    print(f'{label:<32} median={statistics.median(timings_secs) * 1000.0:8.1f}ms '
+          f'min={min(timings_secs) * 1000.0:8.1f}ms max={max(timings_secs) * 1000.0:8.1f}ms n={len(timings_secs)}')
+
+
+class StartupBenchmark(object):
+    def setup_args(self):
+        self._parser = argparse.ArgumentParser()
+        self._parser.add_argument('connector_config', help='Path to the connector config YAML')
+        self._parser.add_argument('--repeat', dest='repeat', type=int, default=5,
+                                  help='Measurements per benchmark, each import is timed in a fresh interpreter')
+        self._parser.add_argument('--module', dest='modules', action='append',
+                                  help='Module to time imports of - Repeatable, defaults to bq_dts.base_connector')
+        self._parser.add_argument('--warm-up', dest='warm_up', action='store_true', default=False,
+                                  help='Also time BaseConnector.warm_up_clients(), needs credentials and connector args')
+
+    def process_args(self, args=None):
+        self._opts, self._connector_args = self._parser.parse_known_args(args=args)
+        self._opts.modules = self._opts.modules or ['bq_dts.base_connector']
+
+    def run(self, args=None):
+        self.setup_args()
+        self.process_args(args=args)
+
+        # Step 1 - Import time, in fresh interpreters so nothing is cached in sys.modules
+        for module_name in self._opts.modules:
+            timings_secs = list()
+            for _ in range(self._opts.repeat):
+                timer_src = IMPORT_TIMER_SRC.format(module_name=module_name)
+                timer_output = subprocess.check_output([sys.executable, '-c', timer_src])
+                timings_secs.append(float(timer_output.decode('utf-8').strip().splitlines()[-1]))
+            _summarize(f'import {module_name}', timings_secs)
+
+        # Step 2 - Connector config load, parsed vs JSON-cached
+        from bq_dts import connector_config
+
+        timings_secs = list()
+        for _ in range(self._opts.repeat):
+            time_start = time.perf_counter()
+            connector_config.ConnectorConfig(connector_config.load_raw_config(self._opts.connector_config))
+            timings_secs.append(time.perf_counter() - time_start)
+        _summarize('config load - YAML', timings_secs)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # NOTE - Populate the cache first, only hits are measured
+            connector_config.load_raw_config(self._opts.connector_config, cache_dir=cache_dir)
+
+            timings_secs = list()
+            for _ in range(self._opts.repeat):
+                time_start = time.perf_counter()
+                raw_config = connector_config.load_raw_config(self._opts.connector_config, cache_dir=cache_dir)
+                connector_config.ConnectorConfig(raw_config)
+                timings_secs.append(time.perf_counter() - time_start)
+            _summarize('config load - cached', timings_secs)
+
+        # Step 3 - Optionally, concurrent API client warm-up
+        if not self._opts.warm_up:
+            return
+
+        from bq_dts import base_connector
+
+        connector = base_connector.BaseConnector()
+        connector.setup_args()
+        connector.process_args(args=self._connector_args + [self._opts.connector_config])
+
+        time_start = time.perf_counter()
+        connector.warm_up_clients()
+        _summarize('client warm-up', [time.perf_counter() - time_start])
+
+
+if __name__ == '__main__':
+    StartupBenchmark().run()
@@ -17,7 +17,7 @@ class CommandLinePartnerDTSClient(object):
     ##### BEGIN - Methods to script init options #####
     def __init__(self, credentials=None):
         self._credentials, self._project = google.auth.default()
-        self._dts_client = rest_client.PartnerDTSClient(credentials=self._credentials)
+        self._dts_client = None
 
         self.logger = logging.getLogger(self.__class__.__module__)
 
@@ -31,11 +31,17 @@ class CommandLinePartnerDTSClient(object):
         self._parser.add_argument('--data-source-id', dest='data_source_id')
         self._parser.add_argument('--update-mask', dest='update_mask')
         self._parser.add_argument('--page-token', dest='page_token')
+        self._parser.add_argument('--dts-backend', dest='dts_backend', default=rest_client.DTSBackend.DISCOVERY,
+                                  choices=[rest_client.DTSBackend.DISCOVERY, rest_client.DTSBackend.LEAN])
 
         self._parser.add_argument('--body-yaml', dest='body_yaml', type=path.Path)
 
     def process_args(self, args=None):
         self._opts = self._parser.parse_args(args=args)
+
+        dts_client_cls = rest_client.DTS_BACKEND_TO_CLIENT_CLS_MAP[self._opts.dts_backend]
+        self._dts_client = dts_client_cls(credentials=self._credentials)
+
         if not self._opts.body_yaml:
             return
 
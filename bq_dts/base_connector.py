@@ -52,33 +52,48 @@ class MyConnector(BaseConnector):
 """
 
 import argparse
-import copy
+import concurrent.futures
+import contextlib
 import datetime
 import functools
+import json
 import logging
+import random
 import sys
 import tempfile
+import threading
+import time
+import tracemalloc
 from typing import List
 
 import google.auth
 import path
 
-from google.cloud import pubsub
-from google.cloud import storage
-from google.cloud import bigquery
-from google.cloud import bigquery_datatransfer
 from googleapiclient import errors
 
-from protobuf_to_dict import protobuf_to_dict
-from ruamel.yaml import YAML
+# NOTE - google.cloud.* clients are imported where first used, they dominate import time
 
 from bq_dts import rest_client
+from bq_dts import connector_config
 from bq_dts import helpers
-
-yaml = YAML(typ='safe')
+from bq_dts import manifest
+from bq_dts import quota
+from bq_dts import scheduling
+from bq_dts import supervisor
+from bq_dts import tracing
+from bq_dts import watermarks
 
 MAX_TRANSFER_RUN_SECS = 12 * 60.0 * 60.0 # 12 hours
 DEFAULT_LOG_FLUSH_SECS = 60                    # 1 minute
+DEFAULT_DTS_MAX_REQUEST_KB = 4 * 1024           # Well under the 10 MB API request limit
+DEFAULT_BQ_LOAD_CONCURRENCY = 8
+DEFAULT_BQ_LOAD_TIMEOUT_SECS = 60 * 60          # 1 hour
+DEFAULT_PARTITION_CONCURRENCY = 4
+DEFAULT_SERVE_POLL_SECS = 1.0
+
+PROFILE_DIRNAME = '_profile'
+CONFIG_CACHE_DIRNAME = '_config_cache'
+QUOTA_STATE_DIRNAME = '_quota'
 
 # https://cloud.google.com/storage/docs/bucket-locations#available_locations
 BQ_DTS_LOCATION_TO_GCS_LOCATION_MAP = {
@@ -89,16 +104,25 @@ BQ_DTS_LOCATION_TO_GCS_LOCATION_MAP = {
 
 ##### BEGIN - _Connector  helpers #####
 class TableContext(object):
-    def __init__(self, imported_data_info=None, table_name=None, uris=None):
+    def __init__(self, imported_data_info=None, table_name=None, uris=None, compiled_idi=None, checksums=None):
         self.imported_data_info = imported_data_info
         self.table_name = table_name
         self.uris = uris
+        # connector_config.CompiledImportedDataInfo, when staged via @table_stager
+        self.compiled_idi = compiled_idi
+        # {uri: MD5} for staged GCS URIs, used for deterministic load job IDs
+        self.checksums = checksums
 
     def to_ImportedDataInfo(self):
-        table_idi = copy.deepcopy(self.imported_data_info)
+        # Prefer the pre-built rest_client.ImportedDataInfoTemplate, only splicing in table name and URIs
+        if self.compiled_idi and self.compiled_idi.idi_template:
+            return self.compiled_idi.idi_template.render(self.table_name, self.uris)
+
+        # NOTE - Shallow copies, self.imported_data_info is shared config and must not be mutated
+        table_idi = dict(self.imported_data_info)
         table_idi.pop('destination_table_id_template', None)
         table_idi['destination_table_id'] = self.table_name
-        table_idi['table_defs'][0]['source_uris'] = self.uris
+        table_idi['table_defs'] = [dict(table_idi['table_defs'][0], source_uris=self.uris)] + table_idi['table_defs'][1:]
         return table_idi
 
 
@@ -141,10 +165,27 @@ class ManagedTransferRun(object):
     logger_cls = TransferRunLogger
 
     def __init__(self, transfer_run=None, dts_client=None, logger=None,
-                 log_flush_secs=DEFAULT_LOG_FLUSH_SECS, timeout=MAX_TRANSFER_RUN_SECS):
+                 log_flush_secs=DEFAULT_LOG_FLUSH_SECS, timeout=MAX_TRANSFER_RUN_SECS, tracemalloc_top=0,
+                 is_decoded=False, watermark_store=None):
         self.transfer_run = transfer_run
         self.dts_client = dts_client
 
+        # watermarks.WatermarkStore, see --watermark-store.  New watermarks are held until commit_watermarks()
+        self.watermark_store = watermark_store
+        self._pending_watermarks = dict()
+
+        # True when transfer_run was decoded straight from protobuf by helpers.decode_transfer_run
+        self.is_decoded = is_decoded
+        # True once params were normalized and validated, see BaseConnector.prepare_transfer_run
+        self.is_prepared = False
+
+        # Data fetched once for several coalesced runs of this config, see BaseConnector.fetch_coalesced_runs
+        self.coalesced_data = None
+
+        # Per-phase timings and memory watermarks, see self.phase()
+        self.metrics = dict(phases=dict())
+        self._tracemalloc_top = tracemalloc_top
+
         # Convenience attributes
         self.name = transfer_run['name']
         self.data_source_id = transfer_run['data_source_id']
@@ -167,23 +208,113 @@ class ManagedTransferRun(object):
         self._timer_log_flush_to_bq_dts = helpers.RepeatedTimer(log_flush_secs, self._log_flush)
         self._timer_timeout = helpers.RepeatedTimer(timeout, self._timeout)
 
+        # Trace this run if a tracing.Tracer is installed, see --trace-dir
+        self._trace_ctx = None
+
+        # manifest.RunManifest checkpointing completed work across redeliveries, see --run-manifest
+        self.manifest = None
+
     def _log_flush(self):
         """
         Periodically flush self.run_logger to BQ DTS TransferRun.LogMessages
 
         :return:
         """
-        if self.dts_client and self._log_handler.msgs:
-            self.dts_client.transfer_run_log_messages(self.name, body=dict(transferMessages=self._log_handler.msgs))
+        with tracing.trace(self.name), tracing.span('log_flush', messages=len(self._log_handler.msgs)):
+            if self.dts_client and self._log_handler.msgs:
+                self.dts_client.transfer_run_log_messages(self.name, body=dict(transferMessages=self._log_handler.msgs))
+
+            self._log_handler.flush()
+
+    def get_watermark(self, table_key, default=None):
+        """
+        Last watermark committed by a successful run of this config, e.g. to only fetch newer data
+
+        :param table_key: Typically the ImportedDataInfo config name, table names change from run to run
+        """
+        if not self.watermark_store:
+            return default
+
+        watermark = self.watermark_store.get(self.config_id, table_key)
+        return default if watermark is None else watermark
+
+    def set_watermark(self, table_key, watermark):
+        """
+        Record a new watermark, only committed once this run's data has been loaded
+        """
+        self._pending_watermarks[table_key] = watermark
+
+    def commit_watermarks(self, is_confirmed=True):
+        """
+        :param is_confirmed: False while this run's loads may still fail, the watermarks are then held as unconfirmed
+            until BaseConnector.confirm_watermarks sees how this run ended
+        """
+        if not self.watermark_store or not self._pending_watermarks:
+            return
 
-        self._log_handler.flush()
+        if is_confirmed:
+            self.watermark_store.set_many(self.config_id, self._pending_watermarks)
+            self.logger.info(f'[{self.name}] Committed watermarks => {self._pending_watermarks}')
+        else:
+            self.watermark_store.add_unconfirmed(self.config_id, self.name, self._pending_watermarks)
+            self.logger.info(f'[{self.name}] Holding watermarks until loads succeed => {self._pending_watermarks}')
+        self._pending_watermarks = dict()
 
     def _timeout(self):
         # Log an error and raise TimeoutError so self.__exit__ clean-up methods get called
         self.run_logger.error(f'Transfer Run timed out after {self._timer_timeout.interval} second(s)!')
         raise TimeoutError
 
+    @contextlib.contextmanager
+    def phase(self, phase_name):
+        """
+        Record duration, RSS watermarks and optionally top tracemalloc allocators for a phase of this run
+
+        with run_ctx.phase('staging'):
+            ...
+
+        :param phase_name:
+        :return:
+        """
+        memory_phase = helpers.MemoryPhase(phase_name, tracemalloc_top=self._tracemalloc_top)
+        try:
+            with memory_phase:
+                yield memory_phase
+        finally:
+            self._record_phase(memory_phase)
+
+    def _record_phase(self, memory_phase):
+        phase_name = memory_phase.name
+        phase_metrics = memory_phase.to_dict()
+        self.metrics['phases'][phase_name] = phase_metrics
+
+        # NOTE - Via run_logger, so phase metrics reach this run's BQ DTS log too
+        self.run_logger.info(f'[{self.name}] [{phase_name.upper()}] {phase_metrics["duration_secs"]}s ; '
+                             f'RSS {phase_metrics["rss_start_mb"]}MB => {phase_metrics["rss_end_mb"]}MB ; '
+                             f'RSS high-water mark {phase_metrics["rss_hwm_mb"]}MB')
+        for current_allocator in phase_metrics['top_allocators']:
+            self.run_logger.info(f'[{self.name}] [{phase_name.upper()}] tracemalloc ; {current_allocator}')
+
+    def _start_trace(self):
+        if not tracing.get_tracer():
+            return
+
+        self._trace_ctx = tracing.TraceContext(self.name, 'transfer_run', name=self.name,
+                                               data_source_id=self.data_source_id, config_id=self.config_id)
+        self._trace_ctx.__enter__()
+
+    def _end_trace(self, exc_type, exc, exc_tb):
+        if not self._trace_ctx:
+            return
+
+        self._trace_ctx.__exit__(exc_type, exc, exc_tb)
+        self._trace_ctx = None
+
+        trace_uri = tracing.get_tracer().export_trace(self.name, f'{self.config_id}.{self.run_id}')
+        self.logger.info(f'[{self.name}] Trace => {trace_uri}')
+
     def __enter__(self):
+        self._start_trace()
         self.logger.info(f'[{self.name}] [STARTING]')
 
         # Step 1 - Start update BQ DTS and run timeout timers
@@ -215,6 +346,7 @@ class ManagedTransferRun(object):
 
         # Step 3 - Short-circuit immediately and die if we experience a BQ DTS API exception
         if isinstance(exc, errors.HttpError):
+            self._end_trace(exc_type, exc, exc_tb)
             return False
 
         # Step 4 - Log the exception to the run
@@ -235,7 +367,13 @@ class ManagedTransferRun(object):
                 self.logger.info(f'[{self.name}] BQ DTS ; Finishing Run - SUCCESS')
 
         # Step 6 - Raise an exception IF there is a regular exception, not a DTS API exception
+        self.metrics['duration_secs'] = round((datetime.datetime.utcnow() - self.time_start_processing).total_seconds(), 3)
+        self.metrics['rss_hwm_mb'] = max(
+            [phase_metrics['rss_hwm_mb'] for phase_metrics in self.metrics['phases'].values()]
+            or [round(helpers.current_rss_bytes() / helpers.BYTES_PER_MB, 1)])
+        self.logger.info(f'[{self.name}] [METRICS] {self.metrics}')
         self.logger.info(f'[{self.name}] [FINISHED]')
+        self._end_trace(exc_type, exc, exc_tb)
 
         # Step 7 - Suppress exception if AssertionError
         return isinstance(exc, AssertionError)
@@ -251,15 +389,7 @@ def templatize_table_name(table_template, run_ctx: ManagedTransferRun):
 
     :return:
     """
-    run_time = run_ctx.transfer_run['run_time']
-
-    table_params = copy.deepcopy(run_ctx.transfer_run['params'])
-    table_params = table_params or dict()
-
-    table_params['run_time'] = run_time
-    table_params['run_yyyymmmdd'] = f'{run_time:%Y%m%d}'
-    table_params['user_id'] = run_ctx.transfer_run['user_id']
-    return table_template.format(**table_params)
+    return connector_config.TableNameFormatter(table_template).format(run_ctx.transfer_run)
 
 def table_stager(idi_config_name, table_template=None):
     """Convenience decorator - Removes standard boilerplate for table staging functions
@@ -273,32 +403,121 @@ def table_stager(idi_config_name, table_template=None):
     :param idi_config_name:
     :return:
     """
+    # Compiled once at decoration time, otherwise the IDI config's own formatter is used
+    table_formatter = connector_config.TableNameFormatter(table_template) if table_template else None
+
     def instancemethod_wrapper(decorated_fxn):
         @functools.wraps(decorated_fxn)
         def wrapped_fxn(self, run_ctx: ManagedTransferRun, *method_args, **method_kwargs) -> TableContext:
             assert isinstance(self, BaseConnector)
 
-            # Step 1 - Pull ImportedDataInfo from the IDI Configs
-            current_idi = self._connector_config['imported_data_info'][idi_config_name]
+            # Step 1 - Pull the compiled ImportedDataInfo from the IDI Configs
+            compiled_idi = self._connector_config.imported_data_infos[idi_config_name]
 
-            # Step 2 - Extract the table name templates
-            chosen_table_template = table_template or current_idi['destination_table_id_template']
+            # Step 2 - Extract the table name formatter
+            chosen_table_formatter = table_formatter or compiled_idi.table_formatter
 
             # Step 3 - Templatize the table name based on 'params', 'run_date', and 'user_id'
-            table_name = templatize_table_name(chosen_table_template, run_ctx)
+            table_name = chosen_table_formatter.format(run_ctx.transfer_run)
 
             # Step 4 - Get the URIs spat out by this function
-            uris = decorated_fxn(self, run_ctx, *method_args, **method_kwargs)
+            uris = _stage_table(run_ctx, idi_config_name, table_name,
+                                lambda: decorated_fxn(self, run_ctx, *method_args, **method_kwargs))
 
             # Step 5 - Create a TableContext and return it
             return TableContext(
-                imported_data_info=current_idi,
+                imported_data_info=compiled_idi.imported_data_info,
                 table_name=table_name,
-                uris=uris
+                uris=uris,
+                compiled_idi=compiled_idi
             )
 
         return wrapped_fxn
     return instancemethod_wrapper
+
+def partitioned_table_stager(idi_config_name, min_date_param='min_date', max_date_param='max_date',
+                             table_template=None, partition_days=1):
+    """Convenience decorator - Splits a date-ranged table into per-partition sub-tasks, staged concurrently
+
+     @partitioned_table_stager(name_of_idi_config)
+     def my_function(self, run_ctx, local_prefix, partition_start, partition_end):
+        return local_uris
+
+    Partitions cover [params[min_date_param], params[max_date_param]] inclusive, partition_days at a time.  Each is
+    staged under {local_prefix}/{yyyymmdd}/ into the table named for partition_start - e.g. "mytable${run_yyyymmmdd}"
+    => "mytable$20180101" - so the template must include "{run_yyyymmmdd}".  Up to --partition-concurrency partitions
+    are staged at once.
+
+    :return: List of TableContexts, one per partition
+    """
+    assert partition_days >= 1
+    table_formatter = connector_config.TableNameFormatter(table_template) if table_template else None
+
+    def instancemethod_wrapper(decorated_fxn):
+        @functools.wraps(decorated_fxn)
+        def wrapped_fxn(self, run_ctx: ManagedTransferRun, local_prefix, *method_args, **method_kwargs) -> List[TableContext]:
+            assert isinstance(self, BaseConnector)
+
+            # Step 1 - Pull the compiled ImportedDataInfo from the IDI Configs
+            compiled_idi = self._connector_config.imported_data_infos[idi_config_name]
+            chosen_table_formatter = table_formatter or compiled_idi.table_formatter
+
+            # Step 2 - Split the run's date range into partitions, each named as if the run were for that day
+            partitions = list()
+            for partition_start, partition_end in helpers.split_date_range(
+                    run_ctx.transfer_run['params'][min_date_param], run_ctx.transfer_run['params'][max_date_param],
+                    partition_days):
+                partition_time = datetime.datetime.combine(partition_start, datetime.time())
+                table_name = chosen_table_formatter.format(dict(run_ctx.transfer_run, run_time=partition_time))
+                partitions.append((partition_start, partition_end, table_name))
+
+            table_names = [table_name for _, _, table_name in partitions]
+            assert len(set(table_names)) == len(table_names), \
+                f'{idi_config_name} - Table template must be unique per partition, e.g. include {{run_yyyymmmdd}}'
+
+            def stage_partition(partition_start, partition_end, table_name):
+                partition_prefix = local_prefix.joinpath(f'{partition_start:%Y%m%d}')
+                return _stage_table(run_ctx, idi_config_name, table_name,
+                    lambda: decorated_fxn(self, run_ctx, partition_prefix, partition_start, partition_end,
+                                          *method_args, **method_kwargs))
+
+            # Step 3 - Stage partitions concurrently, bounded by --partition-concurrency
+            max_workers = max(1, min(self._opts.partition_concurrency, len(partitions)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                partition_futures = [
+                    executor.submit(tracing.wrap(stage_partition), *current_partition) for current_partition in partitions
+                ]
+
+            # Step 4 - Create a TableContext per partition, raising the first failure
+            return [
+                TableContext(
+                    imported_data_info=compiled_idi.imported_data_info,
+                    table_name=table_name,
+                    uris=partition_future.result(),
+                    compiled_idi=compiled_idi
+                )
+                for (_, _, table_name), partition_future in zip(partitions, partition_futures)
+            ]
+
+        return wrapped_fxn
+    return instancemethod_wrapper
+
+def _stage_table(run_ctx: ManagedTransferRun, idi_config_name, table_name, stage_fxn):
+    """
+    Call stage_fxn for local URIs, unless an earlier delivery of this run already staged table_name
+    """
+    uris = run_ctx.manifest.staged_uris(table_name) if run_ctx.manifest else None
+    if uris is not None:
+        run_ctx.logger.info(f'[{run_ctx.name}] Staging local table => {table_name} ; Already staged, skipping')
+        return uris
+
+    with tracing.span(f'table_stager.{idi_config_name}', table_name=table_name):
+        uris = stage_fxn()
+
+    if run_ctx.manifest:
+        run_ctx.manifest.mark_staged(table_name, uris)
+
+    return uris
 ##### END - _Connector implementation helpers #####
 
 class BaseConnector(object):
@@ -315,6 +534,21 @@ class BaseConnector(object):
         self._required_params_set = None
         self._integer_params_set = None
 
+        self._memory_guard = None
+        self._watermark_store = None
+        self._run_coalescer = None
+        self._run_scheduler = None
+        self._admission_controller = None
+
+        # Set within --workers processes by supervisor.Supervisor, see report_run_metrics
+        self.worker_idx = None
+        self.metrics_queue = None
+
+        # Set by stop_serving(), Pub/Sub messages in the callback are counted so they can drain first
+        self._is_stopping = False
+        self._inflight_lock = threading.Lock()
+        self._inflight_messages = 0
+
         default_credentials, self._partner_project_id = google.auth.default()
         self._credentials = credentials or default_credentials
 
@@ -327,8 +561,8 @@ class BaseConnector(object):
         self._parser.add_argument('connector_config', type=path.Path, help='Path to connector.yaml config file')
         self._parser.add_argument('--local-tmpdir', dest='local_tmpdir', type=path.Path, default=tempfile.gettempdir(),
                                   help='Local staging path')
-        self._parser.add_argument('--gcs-tmpdir', dest='gcs_tmpdir', type=path.Path, required=True,
-                                  help='GCS staging path - "gs://staging-bucket/staging-blob-prefix"')
+        self._parser.add_argument('--gcs-tmpdir', dest='gcs_tmpdir', type=path.Path,
+                                  help='GCS staging path - "gs://staging-bucket/staging-blob-prefix" - Required unless --bq-load-local')
         self._parser.add_argument('--gcs-overwrite', dest='gcs_overwrite', action='store_true', default=False,
                                   help='Overwrite existing GCS objects if present')
 
@@ -339,6 +573,139 @@ class BaseConnector(object):
         self._parser.add_argument('--log-flush-secs', dest='log_flush_secs', type=int, default=DEFAULT_LOG_FLUSH_SECS,
                                   help='Seconds before flushing logs to BQ DTS')
 
+        # Args for the BQ DTS API client
+        self._parser.add_argument('--dts-backend', dest='dts_backend', default=rest_client.DTSBackend.DISCOVERY,
+                                  choices=[rest_client.DTSBackend.DISCOVERY, rest_client.DTSBackend.LEAN],
+                                  help='BQ DTS API client - "lean" skips googleapiclient discovery for faster starts')
+        self._parser.add_argument('--dts-http-pool-size', dest='dts_http_pool_size', type=int,
+                                  default=rest_client.DEFAULT_HTTP_POOL_SIZE,
+                                  help='Max keep-alive connections to the BQ DTS API, shared by all threads')
+        self._parser.add_argument('--dts-batch-linger-ms', dest='dts_batch_linger_ms', type=int, default=0,
+                                  help='Coalesce logMessages/patch calls across runs into batch requests sent every N ms - 0 disables')
+        self._parser.add_argument('--dts-max-attempts', dest='dts_max_attempts', type=int,
+                                  default=rest_client.DEFAULT_RETRY_MAX_ATTEMPTS,
+                                  help='Max attempts per BQ DTS API call on transient errors - 1 disables retries')
+        self._parser.add_argument('--dts-max-request-kb', dest='dts_max_request_kb', type=int,
+                                  default=DEFAULT_DTS_MAX_REQUEST_KB,
+                                  help='Split startBigQueryJobs into requests of at most N KB of importedData')
+        self._parser.add_argument('--dts-max-tables-per-request', dest='dts_max_tables_per_request', type=int, default=0,
+                                  help='Split startBigQueryJobs into requests of at most N tables - 0 for no limit')
+        self._parser.add_argument('--dts-start-jobs-concurrency', dest='dts_start_jobs_concurrency', type=int, default=1,
+                                  help='Max concurrent startBigQueryJobs requests per TransferRun')
+        self._parser.add_argument('--gcs-wildcard-min-uris', dest='gcs_wildcard_min_uris', type=int, default=0,
+                                  help='Replace a table\'s source URIs with one GCS wildcard when it has at least N URIs - 0 disables')
+        self._parser.add_argument('--dts-credentials-ttl-secs', dest='dts_credentials_ttl_secs', type=int,
+                                  default=rest_client.DEFAULT_CREDENTIALS_TTL_SECS,
+                                  help='Cache per-user credentials from get_credentials() for N seconds, keep N under '
+                                       'the lifetime of the tokens BQ DTS issues - 0 disables')
+
+        # Args for client-side rate limiting
+        self._parser.add_argument('--api-rate-limit', dest='api_rate_limits', action='append', default=list(),
+                                  type=quota.parse_rate_limit, metavar='API[.METHOD]=QPS',
+                                  help='Throttle calls to "dts", "gcs" or "bigquery" (optionally one method) to QPS - Repeatable')
+        self._parser.add_argument('--quota-state-dir', dest='quota_state_dir', type=path.Path,
+                                  help='Share --api-rate-limit buckets across processes on this host via files in this directory')
+
+        # Args for startup time
+        self._parser.add_argument('--fast-start', dest='fast_start', action='store_true', default=False,
+                                  help='Cache the parsed connector config and warm up API clients concurrently before serving')
+        self._parser.add_argument('--config-cache-dir', dest='config_cache_dir', type=path.Path,
+                                  help='Cache the parsed connector config here, keyed by file hash - Defaults to '
+                                       f'--local-tmpdir/{CONFIG_CACHE_DIRNAME} with --fast-start')
+
+        # Args for dev-mode BigQuery loads, see --transfer-run-yaml
+        self._parser.add_argument('--bq-load-concurrency', dest='bq_load_concurrency', type=int,
+                                  default=DEFAULT_BQ_LOAD_CONCURRENCY,
+                                  help='Max BigQuery load jobs submitted concurrently')
+        self._parser.add_argument('--bq-load-timeout-secs', dest='bq_load_timeout_secs', type=int,
+                                  default=DEFAULT_BQ_LOAD_TIMEOUT_SECS,
+                                  help='Fail the TransferRun if BigQuery load jobs are not done within N seconds')
+        self._parser.add_argument('--bq-load-local', dest='bq_load_local', action='store_true', default=False,
+                                  help='Load locally staged files straight into BigQuery, skipping GCS - Requires --transfer-run-yaml')
+
+        # Args for scheduling Pub/Sub-delivered runs
+        self._parser.add_argument('--max-concurrent-runs', dest='max_concurrent_runs', type=int, default=1,
+                                  help='Max TransferRuns processed at once')
+        self._parser.add_argument('--prefetch-runs', dest='prefetch_runs', type=int, default=0,
+                                  help='Hold N extra runs locally, starting the most urgent first by deadline slack, '
+                                       'learned cost per config and fairness across user_ids - 0 disables')
+        self._parser.add_argument('--schedule-cost-weight', dest='schedule_cost_weight', type=float,
+                                  default=scheduling.DEFAULT_COST_WEIGHT,
+                                  help='Seconds of deadline slack a run of a config is penalized per second of estimated cost')
+        self._parser.add_argument('--schedule-fairness-secs', dest='schedule_fairness_secs', type=float,
+                                  default=scheduling.DEFAULT_FAIRNESS_SECS,
+                                  help='Seconds of deadline slack a run is penalized per run of its user_id already running')
+
+        # Args for multi-process serving, see bq_dts/supervisor.py
+        self._parser.add_argument('--workers', dest='workers', type=int, default=1,
+                                  help='Pre-fork N worker processes, each with its own Pub/Sub subscriber and clients - '
+                                       'Workers are restarted when they exit')
+        self._parser.add_argument('--worker-restart-backoff-secs', dest='worker_restart_backoff_secs', type=float,
+                                  default=supervisor.DEFAULT_RESTART_BACKOFF_SECS,
+                                  help='Initial delay before restarting a crash-looping worker, doubling per crash')
+        self._parser.add_argument('--supervisor-report-secs', dest='supervisor_report_secs', type=float,
+                                  default=supervisor.DEFAULT_REPORT_SECS,
+                                  help='Log metrics aggregated across workers every N seconds')
+        self._parser.add_argument('--worker-shutdown-secs', dest='worker_shutdown_secs', type=float,
+                                  default=supervisor.DEFAULT_SHUTDOWN_SECS,
+                                  help='On shutdown, wait up to N seconds for workers to finish in-flight runs before killing them')
+
+        # Args for admission control of Pub/Sub-delivered runs, runs are nacked for other replicas without headroom
+        self._parser.add_argument('--admit-min-free-disk-mb', dest='admit_min_free_disk_mb', type=int, default=0,
+                                  help='Only accept runs with at least N MB free under --local-tmpdir - 0 disables')
+        self._parser.add_argument('--admit-min-free-memory-mb', dest='admit_min_free_memory_mb', type=int, default=0,
+                                  help='Only accept runs with at least N MB of available host memory - 0 disables')
+        self._parser.add_argument('--admit-max-load-per-cpu', dest='admit_max_load_per_cpu', type=float, default=0.0,
+                                  help='Only accept runs while the 1-minute load average per CPU is at most N - 0 disables')
+        self._parser.add_argument('--admit-max-upload-mb', dest='admit_max_upload_mb', type=int, default=0,
+                                  help='Only accept runs while at most N MB are being uploaded to GCS - 0 disables')
+        self._parser.add_argument('--admit-backoff-secs', dest='admit_backoff_secs', type=float,
+                                  default=scheduling.DEFAULT_ADMISSION_BACKOFF_SECS,
+                                  help='Initial backoff after a rejected run, doubling per consecutive rejection')
+
+        # Args for coalescing Pub/Sub-delivered runs, see fetch_coalesced_runs
+        self._parser.add_argument('--coalesce-window-ms', dest='coalesce_window_ms', type=int, default=0,
+                                  help='Batch runs of the same config arriving within N ms for one fetch_coalesced_runs() call - 0 disables')
+        self._parser.add_argument('--coalesce-max-runs', dest='coalesce_max_runs', type=int,
+                                  default=scheduling.DEFAULT_COALESCE_MAX_RUNS,
+                                  help='Max runs per coalesced batch, also the max Pub/Sub messages held at once when coalescing')
+
+        # Args for date-ranged runs, see partitioned_table_stager
+        self._parser.add_argument('--partition-concurrency', dest='partition_concurrency', type=int,
+                                  default=DEFAULT_PARTITION_CONCURRENCY,
+                                  help='Max partitions of one table staged concurrently')
+
+        # Args for incremental fetches
+        self._parser.add_argument('--watermark-store', dest='watermark_store',
+                                  help='Persist per-config watermarks for run_ctx.get_watermark() - '
+                                       'A local SQLite file or "gs://{bucket}/{prefix}"')
+
+        # Args for resuming redelivered TransferRuns
+        self._parser.add_argument('--run-manifest', dest='run_manifest', action='store_true', default=False,
+                                  help=f'Checkpoint staged/uploaded tables and started BQ DTS requests to {manifest.MANIFEST_FILENAME} '
+                                       'under the local staging prefix, skipping them when a TransferRun is redelivered')
+        self._parser.add_argument('--run-manifest-gcs', dest='run_manifest_gcs', action='store_true', default=False,
+                                  help='Mirror --run-manifest to --gcs-tmpdir, so runs redelivered to another host resume too')
+
+        # Args for profiling
+        self._parser.add_argument('--profile-runs', dest='profile_runs', type=float, default=0.0,
+                                  help='Fraction of TransferRuns to CPU profile [0.0, 1.0] - Profiles written under --local-tmpdir')
+        self._parser.add_argument('--profile-upload', dest='profile_upload', action='store_true', default=False,
+                                  help='Upload CPU profiles to --gcs-tmpdir next to the staged data')
+
+        # Args for memory tracking
+        self._parser.add_argument('--tracemalloc-top', dest='tracemalloc_top', type=int, default=0,
+                                  help='Log the top N tracemalloc allocators per TransferRun phase - 0 disables tracemalloc')
+        self._parser.add_argument('--memory-soft-limit-mb', dest='memory_soft_limit_mb', type=int, default=0,
+                                  help='Pause intake and flush writers when RSS exceeds this many MB - 0 disables')
+
+        # Args for tracing
+        self._parser.add_argument('--trace-dir', dest='trace_dir', type=path.Path,
+                                  help='Write a span trace per TransferRun to this local directory')
+        self._parser.add_argument('--trace-format', dest='trace_format', default=tracing.TraceFormat.CHROME,
+                                  choices=[tracing.TraceFormat.CHROME, tracing.TraceFormat.OTLP],
+                                  help='Trace file format - Chrome trace-event JSON or OTLP/JSON')
+
         # Args used for testing
         self._parser.add_argument('--transfer-run-yaml', dest='transfer_run_yaml', type=path.Path,
                                   help='Path to TransferRun YAML')
@@ -354,27 +721,106 @@ class BaseConnector(object):
 
         # Step 2 - Load ImportedDataInfo config file
         connector_config_path = self._opts.connector_config.abspath()
-        with connector_config_path.open() as connector_config_fp:
-            self._connector_config = yaml.load(connector_config_fp)
-
-        # Step 3 - Data Source Definintion parsing
-        data_source_dict = self._connector_config['data_source_definition']['data_source']
-        # If there are no parameters create one to avoid a null check.
-        data_source_dict['parameters'] = data_source_dict['parameters'] or dict()
+        config_cache_dir = self._opts.config_cache_dir
+        if not config_cache_dir and self._opts.fast_start:
+            config_cache_dir = self._opts.local_tmpdir.joinpath(CONFIG_CACHE_DIRNAME)
 
-        self._required_params_set = {
-            current_param['param_id'] for current_param in data_source_dict['parameters'] if current_param.get('required')
-        }
-        self._integer_params_set = {
-            current_param['param_id'] for current_param in data_source_dict['parameters'] if current_param['type'] == 'INTEGER'
-        }
+        raw_connector_config = connector_config.load_raw_config(connector_config_path,
+            cache_dir=config_cache_dir.abspath() if config_cache_dir else None)
 
+        # Step 3 - Compile the config once - param sets, IDI bodies, schemas and table name formatters
+        self._connector_config = connector_config.ConnectorConfig(raw_connector_config)
+        self._required_params_set = self._connector_config.required_params
+        self._integer_params_set = self._connector_config.integer_params
 
         self._is_testing = bool(self._opts.transfer_run_yaml)
 
         # Step 5 - Validate args
         assert self._opts.transfer_run_yaml or self._opts.ps_subname
+        assert self._opts.gcs_tmpdir or self._opts.bq_load_local, '--gcs-tmpdir is required unless --bq-load-local'
+        assert self._opts.transfer_run_yaml or not self._opts.bq_load_local, '--bq-load-local is dev-only'
+        assert self._opts.gcs_tmpdir or not self._opts.profile_upload, '--profile-upload requires --gcs-tmpdir'
+        assert self._opts.run_manifest or not self._opts.run_manifest_gcs, '--run-manifest-gcs requires --run-manifest'
+        assert self._opts.gcs_tmpdir or not self._opts.run_manifest_gcs, '--run-manifest-gcs requires --gcs-tmpdir'
         assert self._opts.log_flush_secs <= self._opts.max_transfer_run_secs
+        assert self._opts.dts_http_pool_size > 0
+        assert self._opts.dts_batch_linger_ms >= 0
+        assert self._opts.dts_max_attempts >= 1
+        assert self._opts.dts_credentials_ttl_secs >= 0
+        assert self._opts.dts_max_request_kb > 0
+        assert self._opts.dts_max_tables_per_request >= 0
+        assert self._opts.dts_start_jobs_concurrency >= 1
+        assert self._opts.gcs_wildcard_min_uris >= 0
+        assert self._opts.bq_load_concurrency >= 1
+        assert self._opts.bq_load_timeout_secs > 0
+        assert self._opts.partition_concurrency >= 1
+        assert self._opts.coalesce_window_ms >= 0
+        assert self._opts.max_concurrent_runs >= 1
+        assert self._opts.prefetch_runs >= 0
+        assert self._opts.schedule_cost_weight >= 0.0
+        assert self._opts.schedule_fairness_secs >= 0.0
+        assert self._opts.admit_min_free_disk_mb >= 0
+        assert self._opts.admit_min_free_memory_mb >= 0
+        assert self._opts.admit_max_load_per_cpu >= 0.0
+        assert self._opts.admit_max_upload_mb >= 0
+        assert self._opts.admit_backoff_secs >= 0.0
+        assert self._opts.workers >= 1
+        assert self._opts.workers == 1 or self._opts.ps_subname, '--workers requires --ps-subname'
+        assert self._opts.worker_restart_backoff_secs >= 0.0
+        assert self._opts.supervisor_report_secs > 0.0
+        assert self._opts.worker_shutdown_secs >= 0.0
+        assert self._opts.coalesce_max_runs >= 1
+        assert 0.0 <= self._opts.profile_runs <= 1.0
+        assert self._opts.tracemalloc_top >= 0
+        assert self._opts.memory_soft_limit_mb >= 0
+
+        # Step 6 - Setup memory tracking
+        if self._opts.tracemalloc_top and not tracemalloc.is_tracing():
+            tracemalloc.start(helpers.DEFAULT_TRACEMALLOC_FRAMES)
+
+        if self._opts.memory_soft_limit_mb:
+            self._memory_guard = helpers.MemoryGuard(self._opts.memory_soft_limit_mb * helpers.BYTES_PER_MB,
+                                                     logger=self.logger)
+
+        # Step 7 - Setup tracing
+        if self._opts.trace_dir:
+            trace_exporter = tracing.FileExporter(self._opts.trace_dir.abspath(), self._opts.trace_format)
+            tracing.set_tracer(tracing.Tracer(exporter=trace_exporter))
+
+        # Step 8 - Setup client-side rate limiting, shared across --workers processes via files
+        if self._opts.api_rate_limits:
+            quota_state_dir = self._opts.quota_state_dir
+            if not quota_state_dir and self._opts.workers > 1:
+                quota_state_dir = self._opts.local_tmpdir.joinpath(QUOTA_STATE_DIRNAME)
+
+            quota_state_dir = quota_state_dir.abspath() if quota_state_dir else None
+            quota.set_governor(quota.QuotaGovernor(dict(self._opts.api_rate_limits), state_dir=quota_state_dir,
+                                                   logger=self.logger))
+
+        # Step 9 - Setup coalescing of runs for the same config
+        if self._opts.coalesce_window_ms:
+            self._run_coalescer = scheduling.RunCoalescer(self.process_coalesced_runs,
+                                                          self._opts.coalesce_window_ms / 1000.0,
+                                                          max_batch_size=self._opts.coalesce_max_runs)
+
+        # Step 10 - Setup priority scheduling of prefetched runs, bounding concurrency whenever more runs are leased
+        # than --max-concurrent-runs, e.g. to coalesce them
+        if self.max_leased_messages() > self._opts.max_concurrent_runs:
+            self._run_scheduler = scheduling.PriorityScheduler(self._opts.max_concurrent_runs,
+                                                               cost_weight=self._opts.schedule_cost_weight,
+                                                               fairness_secs=self._opts.schedule_fairness_secs)
+
+        # Step 11 - Setup resource-aware admission control
+        if (self._opts.admit_min_free_disk_mb or self._opts.admit_min_free_memory_mb
+                or self._opts.admit_max_load_per_cpu or self._opts.admit_max_upload_mb):
+            self._admission_controller = scheduling.AdmissionController(
+                self._opts.local_tmpdir.abspath(),
+                min_free_disk_bytes=self._opts.admit_min_free_disk_mb * helpers.BYTES_PER_MB,
+                min_free_memory_bytes=self._opts.admit_min_free_memory_mb * helpers.BYTES_PER_MB,
+                max_load_per_cpu=self._opts.admit_max_load_per_cpu,
+                max_upload_bytes=self._opts.admit_max_upload_mb * helpers.BYTES_PER_MB,
+                backoff_secs=self._opts.admit_backoff_secs,
+                logger=self.logger)
         # assert self._opts.max_transfer_run_secs <= data_source_dict['update_deadline_seconds']
 
     ##### END - Methods to script init options #####
@@ -385,10 +831,33 @@ class BaseConnector(object):
         self.setup_args()
         self.process_args(args=args)
 
-        if self._is_testing:
-            self.trigger_via_file()
-        else:
-            self.trigger_via_pubsub()
+        # Pre-fork --workers processes, each calling self.serve()
+        if self._opts.workers > 1:
+            worker_supervisor = supervisor.Supervisor(self, self._opts.workers,
+                                                      restart_backoff_secs=self._opts.worker_restart_backoff_secs,
+                                                      report_secs=self._opts.supervisor_report_secs,
+                                                      shutdown_secs=self._opts.worker_shutdown_secs,
+                                                      logger=self.logger)
+            worker_supervisor.run()
+            return
+
+        self.serve()
+
+    def serve(self):
+        if self._memory_guard:
+            self._memory_guard.start()
+
+        try:
+            if self._opts.fast_start:
+                self.warm_up_clients()
+
+            if self._is_testing:
+                self.trigger_via_file()
+            else:
+                self.trigger_via_pubsub()
+        finally:
+            if self._memory_guard:
+                self._memory_guard.stop()
 
     def trigger_via_file(self):
         self.logger.info(f'Triggering via file - {self._opts.transfer_run_yaml}')
@@ -396,57 +865,140 @@ class BaseConnector(object):
         # Step 2 - Load the a TransferRun from YAML vs via the Pub/Sub subscription
         transfer_run_yaml_path = self._opts.transfer_run_yaml.abspath()
         with transfer_run_yaml_path.open() as fp:
-            current_run = yaml.load(fp)
+            current_run = connector_config.yaml_load(fp)
 
         # Step 3 - Setup a ManagedTransferRun
-        with ManagedTransferRun(current_run, dts_client=self.dts_client, logger=self.logger,
-                                log_flush_secs=self._opts.log_flush_secs, timeout=self._opts.max_transfer_run_secs) as run_ctx:
-            self.process_transfer_run(run_ctx)
+        with self.managed_transfer_run(current_run) as run_ctx:
+            self.execute_transfer_run(run_ctx)
+
+    def warm_up_clients(self):
+        """
+        Create API clients concurrently before serving, instead of serially on the first TransferRun
+        """
+        # NOTE - No BQ DTS client in testing, loads go through BigQuery directly
+        warm_up_fxns = [lambda: self.gcs_client]
+        if self._is_testing:
+            warm_up_fxns.append(lambda: self.bq_client)
+        else:
+            warm_up_fxns.append(lambda: self.dts_client.warm_up())
+            warm_up_fxns.append(lambda: self.ps_sub_client)
+
+        time_start = datetime.datetime.utcnow()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(warm_up_fxns)) as executor:
+            for warm_up_future in [executor.submit(current_fxn) for current_fxn in warm_up_fxns]:
+                warm_up_future.result()
+
+        warm_up_secs = (datetime.datetime.utcnow() - time_start).total_seconds()
+        self.logger.info(f'Warmed up API clients in {warm_up_secs:.3f}s')
 
     def trigger_via_pubsub(self):
         # Step 1 - Determine the Pub/Sub subscription to subscribe to
         sub_path = self.ps_sub_client.subscription_path(self._partner_project_id, self._opts.ps_subname)
         self.logger.info(f'Triggering via Pub/Sub Subscription => {sub_path}')
 
-        # Step 2 - Setup the Subscription-specific callback, listening for 1 message at a time
+        # Step 2 - Setup the Subscription-specific callback, listening for --max-concurrent-runs messages at a time
         # https://google-cloud-python.readthedocs.io/en/latest/pubsub/subscriber/index.html#pulling-a-subscription
-        default_fc = pubsub.types.FlowControl(max_messages=1, max_lease_duration=self._opts.max_transfer_run_secs)
-        future = self.ps_sub_client.subscribe(sub_path, callback=self.pubsub_callback, flow_control=default_fc)
+        # NOTE - Prefetched runs wait in the PriorityScheduler, coalescing needs several messages in hand to batch them
+        from google.cloud import pubsub
+        max_messages = self.max_leased_messages()
+        default_fc = pubsub.types.FlowControl(max_messages=max_messages, max_lease_duration=self._opts.max_transfer_run_secs)
+
+        # NOTE - One callback thread per leased message, the default scheduler's 10 threads would leave the rest queued
+        # FIFO in its executor, never reaching the PriorityScheduler or the RunCoalescer
+        from google.cloud.pubsub_v1.subscriber import scheduler
+        callback_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_messages)
+        future = self.ps_sub_client.subscribe(sub_path, callback=self.pubsub_callback, flow_control=default_fc,
+                                              scheduler=scheduler.ThreadScheduler(executor=callback_executor))
+
+        # Step 3 - Block until exception or stop_serving(), subscribe uses threads to continue progress
+        while not future.done() and not self._is_stopping:
+            time.sleep(DEFAULT_SERVE_POLL_SECS)
+
+        # Step 4 - When stopping, let in-flight runs finish and ack while the stream is still open, then close it
+        if not future.done():
+            self.logger.info(f'Stopping ; Waiting on {self._inflight_messages} in-flight messages')
+            while self._inflight_messages and not future.done():
+                time.sleep(DEFAULT_SERVE_POLL_SECS)
+            future.cancel()
+            self.logger.info('Stopped')
+            return
 
-        # Step 3 - Block until exception, subscribe uses threads to continue progress
         future.result()
 
+    def max_leased_messages(self):
+        """
+        Pub/Sub messages held at once - runs in progress, prefetched runs, and runs waiting to be coalesced
+        """
+        max_messages = self._opts.max_concurrent_runs + self._opts.prefetch_runs
+        if self._run_coalescer:
+            max_messages = max(max_messages, self._opts.coalesce_max_runs)
+        return max_messages
+
+    def stop_serving(self):
+        """
+        Stop taking new Pub/Sub messages and return from serve() once in-flight runs finished
+
+        NOTE - Safe to call from a signal handler, only sets a flag
+        """
+        self._is_stopping = True
+
 
     def pubsub_callback(self, ps_message):
+        # NOTE - Hand messages leased while stopping straight back, for other workers and replicas
+        if self._is_stopping:
+            ps_message.nack()
+            return
+
+        with self._inflight_lock:
+            self._inflight_messages += 1
+        try:
+            self.process_pubsub_message(ps_message)
+        finally:
+            with self._inflight_lock:
+                self._inflight_messages -= 1
+
+    def process_pubsub_message(self, ps_message):
         # Step 1 - Load in a TransferRun message
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rpc/google.cloud.bigquery.datatransfer.v1#transferrun
+        from google.cloud import bigquery_datatransfer
         transfer_run_obj = bigquery_datatransfer.types.TransferRun()
         transfer_run_obj.ParseFromString(ps_message.data)
 
-        # Step 2 - Convert to a Python dict
-        current_run = protobuf_to_dict(transfer_run_obj, use_enum_labels=True)
-
-        # Step 3 - Setup a ManagedTransferRun
-        retry_transfer_run = False
-        try:
-            with ManagedTransferRun(current_run,
-                                    dts_client=self.dts_client, logger=self.logger,
-                                    log_flush_secs=self._opts.log_flush_secs,
-                                    timeout=self._opts.max_transfer_run_secs) as run_ctx:
-                self.process_transfer_run(run_ctx)
-        except errors.HttpError as dts_api_error:
-            # Step 4a - If there's an unrecoverable BQ DTS API error...
-            #   A) Log the error to STDERR
-            #   B) Do NOT re-raise the error so we can ack the message off Pub/Sub... otherwise we get into a infinite loop
-            if dts_api_error.resp.status in (400, 404):
-                self.logger.error(f'Unrecoverable BigQuery Data Transfer Service API error - {dts_api_error.resp.status}')
-                self.logger.error(dts_api_error.content.decode("utf-8"))
-            # Step 4b - Re-raise the error so we can put this TransferRun back on the Pub/Sub subscription
-            else:
-                retry_transfer_run = True
-        except AssertionError:
-            # Step 5 - Do not retry on AssertionErrors, likely caused by invalid parameters
-            retry_transfer_run = False
+        # Step 2 - Decode straight to a normalized Python dict, integer params are cast within the ManagedTransferRun
+        current_run = helpers.decode_transfer_run(transfer_run_obj)
+
+        # Step 3 - Without local headroom, back off, then hand the run back to Pub/Sub for other replicas
+        # NOTE - Back off BEFORE nacking, holding the lease keeps its flow control slot so no new message is leased meanwhile
+        if self._admission_controller:
+            is_admitted, backoff_secs = self._admission_controller.admit()
+            if not is_admitted:
+                self.logger.warning(f'[{current_run["name"]}] Not admitted ; Backing off {backoff_secs:.1f}s')
+                time.sleep(backoff_secs)
+                is_admitted, _ = self._admission_controller.admit()
+
+            if not is_admitted:
+                self.logger.warning(f'[{current_run["name"]}] Not admitted ; Nacked')
+                ps_message.nack()
+                return
+
+        # Step 4 - Hold off on new work while over the memory soft limit, for at most --admit-backoff-secs
+        # NOTE - RSS may never drop back, freed memory is rarely returned to the OS, so hand the run back like Step 3
+        if self._memory_guard and not self._memory_guard.has_headroom:
+            self.logger.warning(f'[{current_run["name"]}] Waiting for memory headroom')
+            if not self._memory_guard.wait_for_headroom(timeout=self._opts.admit_backoff_secs):
+                self.logger.warning(f'[{current_run["name"]}] No memory headroom ; Nacked')
+                ps_message.nack()
+                return
+
+        # Step 5 - Process the run, sharing one fetch with other runs of its config when coalescing
+        # NOTE - Only the shared fetch runs on the batch leader's thread, each run is processed on its own callback thread
+        run_ctx = self.managed_transfer_run(current_run, is_decoded=True)
+        if self._run_coalescer:
+            try:
+                run_ctx.coalesced_data = self._run_coalescer.submit(run_ctx.config_id, run_ctx)
+            except Exception:
+                self.logger.exception(f'[{run_ctx.name}] Coalescing failed, fetching on its own')
+        retry_transfer_run = self.execute_pubsub_transfer_run(run_ctx)
 
         # Step 6 - Ack the Pub/Sub message
         if retry_transfer_run:
@@ -454,33 +1006,236 @@ class BaseConnector(object):
         else:
             ps_message.ack()
 
+    def execute_pubsub_transfer_run(self, run_ctx: ManagedTransferRun):
+        """
+        :return: True if the Pub/Sub message should be nacked, so the TransferRun is redelivered
+        """
+        # Step 1 - Wait for our turn when prefetching, see --prefetch-runs
+        run_slot = contextlib.ExitStack()
+        if self._run_scheduler:
+            run_slot = self._run_scheduler.slot(run_ctx.config_id, run_ctx.transfer_run.get('user_id'),
+                                                self.transfer_run_deadline_ts(run_ctx.transfer_run))
+
+        # Step 2 - Setup a ManagedTransferRun
+        retry_transfer_run = False
+        with run_slot:
+            try:
+                with run_ctx:
+                    self.execute_transfer_run(run_ctx)
+            except errors.HttpError as dts_api_error:
+                # Step 3a - If there's an unrecoverable BQ DTS API error...
+                #   A) Log the error to STDERR
+                #   B) Do NOT re-raise the error so we can ack the message off Pub/Sub... otherwise we get into a infinite loop
+                if dts_api_error.resp.status in (400, 404):
+                    self.logger.error(f'Unrecoverable BigQuery Data Transfer Service API error - {dts_api_error.resp.status}')
+                    self.logger.error(dts_api_error.content.decode("utf-8"))
+                # Step 3b - Re-raise the error so we can put this TransferRun back on the Pub/Sub subscription
+                else:
+                    retry_transfer_run = True
+            except AssertionError:
+                # Step 4 - Do not retry on AssertionErrors, likely caused by invalid parameters
+                retry_transfer_run = False
+            except Exception:
+                # Step 5 - Anything else, e.g. retries exhausted on a transport error, nack so the run is redelivered
+                # NOTE - Never raise, every message must be acked or nacked
+                self.logger.exception(f'[{run_ctx.name}] Unexpected error ; Nacking')
+                retry_transfer_run = True
+
+        self.report_run_metrics(run_ctx, retry_transfer_run)
+        return retry_transfer_run
+
+    def report_run_metrics(self, run_ctx: ManagedTransferRun, retry_transfer_run):
+        """
+        Ship this run's metrics to the supervisor, when running as one of --workers
+        """
+        if self.metrics_queue is None:
+            return
+
+        self.metrics_queue.put(dict(worker_idx=self.worker_idx, name=run_ctx.name, config_id=run_ctx.config_id,
+                                    retry=retry_transfer_run, duration_secs=run_ctx.metrics.get('duration_secs'),
+                                    rss_hwm_mb=run_ctx.metrics.get('rss_hwm_mb')))
+
+    def transfer_run_deadline_ts(self, transfer_run):
+        """
+        Epoch seconds by which BQ DTS fails a run without an update - its last update + "update_deadline_seconds"
+        """
+        update_deadline_secs = (self._connector_config.data_source.get('update_deadline_seconds')
+                                or self._opts.max_transfer_run_secs)
+        last_update_time = transfer_run.get('update_time') or transfer_run.get('schedule_time')
+        if not last_update_time:
+            return time.time() + update_deadline_secs
+
+        return (last_update_time - helpers.EPOCH).total_seconds() + update_deadline_secs
+
+    def process_coalesced_runs(self, run_ctxs: List[ManagedTransferRun]):
+        """
+        Fetch once for a batch of runs of one config from scheduling.RunCoalescer
+
+        Each caller then stages, loads and finishes its own run on its own thread, see process_pubsub_message
+
+        :return: Per run, the coalesced_data to process it with - None to fetch its own data
+        """
+        # Step 1 - Prepare each run, runs with invalid params are left out of the shared fetch
+        # NOTE - Those are re-prepared, and so fail, within their own ManagedTransferRun
+        batch_run_ctxs = list()
+        for run_ctx in run_ctxs:
+            try:
+                self.prepare_transfer_run(run_ctx)
+                batch_run_ctxs.append(run_ctx)
+            except Exception as prepare_error:
+                self.logger.warning(f'[{run_ctx.name}] Not coalesced - {prepare_error!r}')
+
+        # Step 2 - Fetch once for the whole batch, falling back to per-run fetches on failure
+        coalesced_data = None
+        if len(batch_run_ctxs) > 1:
+            self.logger.info(f'Coalesced {len(batch_run_ctxs)} runs => {[run_ctx.name for run_ctx in batch_run_ctxs]}')
+            try:
+                coalesced_data = self.fetch_coalesced_runs(batch_run_ctxs)
+            except Exception:
+                self.logger.exception('Coalesced fetch failed, fetching per run')
+
+        # Step 3 - Hand the shared data back to the callers of runs in the fetch
+        return [coalesced_data if run_ctx in batch_run_ctxs else None for run_ctx in run_ctxs]
+
+    def fetch_coalesced_runs(self, run_ctxs: List[ManagedTransferRun]):
+        """
+        Optional hook, see --coalesce-window-ms - Fetch data once for several runs of the same config, e.g. the union
+        of their date ranges
+
+        The return value is set as run_ctx.coalesced_data on every run before staging, so table stagers can fan it
+        back out into per-run tables.  Return None to have each run fetch its own data.
+
+        :param run_ctxs: Runs of one config, params already validated
+        """
+        return None
+
+    def managed_transfer_run(self, transfer_run, is_decoded=False) -> ManagedTransferRun:
+        return ManagedTransferRun(transfer_run, dts_client=self.dts_client, logger=self.logger,
+                                  log_flush_secs=self._opts.log_flush_secs, timeout=self._opts.max_transfer_run_secs,
+                                  tracemalloc_top=self._opts.tracemalloc_top, is_decoded=is_decoded,
+                                  watermark_store=self.watermark_store)
+
     def validate_transfer_run_params(self, transfer_run_params):
         assert self._required_params_set <= set(transfer_run_params)
         return transfer_run_params
 
-    def process_transfer_run(self, run_ctx):
+    def execute_transfer_run(self, run_ctx: ManagedTransferRun):
+        """
+        Calls process_transfer_run, optionally under a CPU profiler based on --profile-runs
+
+        :param run_ctx:
+        :return:
+        """
+        # Step 1 - Fast path, no profiling overhead unless a run is sampled
+        if not self._opts.profile_runs or random.random() >= self._opts.profile_runs:
+            return self.process_transfer_run(run_ctx)
+
+        # Step 2 - Profile @ /tmp/{data_source_id}/{config_id}/{run_id}/_profile/{run_id}.{pstats,collapsed}
+        local_prefix = self.local_prefix_for_transfer_run(run_ctx)
+        profiler = helpers.RunProfiler(local_prefix.joinpath(PROFILE_DIRNAME), run_ctx.run_id or 'no_run_id')
+        try:
+            with profiler:
+                return self.process_transfer_run(run_ctx)
+        finally:
+            if profiler.is_profiling:
+                self.logger.info(f'[{run_ctx.name}] Profiled run => {profiler.output_uris}')
+            else:
+                self.logger.info(f'[{run_ctx.name}] Not profiled, another run is being profiled')
+
+            # Step 3 - Optionally upload the profile next to the staged data
+            if self._opts.profile_upload and profiler.output_uris:
+                try:
+                    helpers.upload_multiple_files_to_gcs(self.gcs_client, profiler.output_uris,
+                        local_prefix=local_prefix, gcs_prefix=self.gcs_prefix_for_transfer_run(run_ctx), overwrite=True)
+                except Exception:
+                    self.logger.exception(f'[{run_ctx.name}] Failed to upload profile')
+
+    def prepare_transfer_run(self, run_ctx: ManagedTransferRun):
+        """
+        Normalize and validate TransferRun params, once per run
+        """
+        if run_ctx.is_prepared:
+            return
+
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rpc/google.cloud.bigquery.datatransfer.v1#transferrun
-        # Step 1 - Normalize the RPC-based Transfer Run
-        run_ctx.transfer_run = helpers.normalize_transfer_run(run_ctx.transfer_run,
-            integer_params=self._integer_params_set)
+        # Step 1 - Normalize the RPC-based Transfer Run, runs decoded from protobuf only need integer casts
+        with tracing.span('normalize_transfer_run'):
+            if run_ctx.is_decoded:
+                helpers.cast_integer_params(run_ctx.transfer_run['params'], self._integer_params_set)
+            else:
+                run_ctx.transfer_run = helpers.normalize_transfer_run(run_ctx.transfer_run,
+                    integer_params=self._integer_params_set)
 
         # Step 2 - Parse TransferRun Params specific to this Connector
         run_ctx.transfer_run['params'] = self.validate_transfer_run_params(run_ctx.transfer_run['params'])
+        run_ctx.is_prepared = True
+
+    def process_transfer_run(self, run_ctx):
+        # Steps 1 + 2 - Normalize and validate params, unless already done for a coalesced fetch
+        self.prepare_transfer_run(run_ctx)
+
+        # Step 2b - Commit watermarks of earlier runs of this config whose loads have since succeeded
+        # NOTE - Best effort, watermarks left unconfirmed only make this run fetch more than it needs
+        if self.watermark_store and self.dts_client:
+            try:
+                with tracing.span('confirm_watermarks'):
+                    self.confirm_watermarks(run_ctx)
+            except Exception:
+                self.logger.exception(f'[{run_ctx.name}] Failed to confirm earlier watermarks')
+
+        # Step 3 - Stage data for your transfer run, resuming from an earlier delivery's manifest if any
+        if self._opts.run_manifest:
+            run_ctx.manifest = self.run_manifest_for_transfer_run(run_ctx)
+            if run_ctx.manifest.load():
+                self.logger.info(f'[{run_ctx.name}] Resuming from manifest => {run_ctx.manifest.local_uri}')
 
-        # Step 3 - Stage data for your transfer run
         self.logger.info(f'[{run_ctx.name}] [STAGING]')
-        gcs_table_ctxs = self.stage_data_for_transfer_run(run_ctx)
+        with run_ctx.phase('staging'), tracing.span('stage_data_for_transfer_run'):
+            gcs_table_ctxs = self.stage_data_for_transfer_run(run_ctx)
 
         # Step 4 - Kick off load jobs info BigQuery
         if not gcs_table_ctxs:
             self.logger.info(f'[{run_ctx.name}] [LOADING] Nothing to load')
-            return
-
-        self.logger.info(f'[{run_ctx.name}] [LOADING]')
-        if self._is_testing:
-            self.start_bigquery_jobs_via_bq_apis(run_ctx, gcs_table_ctxs)
         else:
-            self.start_bigquery_jobs_via_dts_apis(run_ctx, gcs_table_ctxs)
+            self.logger.info(f'[{run_ctx.name}] [LOADING]')
+            with run_ctx.phase('loading'), tracing.span('start_bigquery_jobs', table_count=len(gcs_table_ctxs)):
+                if self._is_testing:
+                    self.start_bigquery_jobs_via_bq_apis(run_ctx, gcs_table_ctxs)
+                else:
+                    self.start_bigquery_jobs_via_dts_apis(run_ctx, gcs_table_ctxs)
+
+        # Step 5 - Only advance watermarks once loads succeeded, a failed run re-fetches the same delta
+        # NOTE - BQ DTS runs the loads after finishRun, so those watermarks wait for a later run to confirm them
+        run_ctx.commit_watermarks(is_confirmed=self._is_testing)
+
+    def confirm_watermarks(self, run_ctx: ManagedTransferRun):
+        """
+        Commit, oldest first, the unconfirmed watermarks of earlier runs of this config that BQ DTS reports SUCCEEDED
+
+        Watermarks of FAILED, CANCELLED or deleted runs are dropped.  Stops at the first run still in progress, so
+        watermarks are never committed out of order.
+        """
+        for run_name, _ in run_ctx.watermark_store.list_unconfirmed(run_ctx.config_id):
+            if run_name == run_ctx.name:
+                break
+
+            try:
+                run_state = self.dts_client.transfer_run_get(run_name).get('state')
+            except errors.HttpError as dts_api_error:
+                if dts_api_error.resp.status != 404:
+                    raise
+                run_state = rest_client.TransferState.CANCELLED
+
+            if run_state == rest_client.TransferState.SUCCEEDED:
+                is_succeeded = True
+            elif run_state in (rest_client.TransferState.FAILED, rest_client.TransferState.CANCELLED):
+                is_succeeded = False
+            else:
+                break
+
+            run_ctx.watermark_store.confirm(run_ctx.config_id, run_name, is_succeeded)
+            self.logger.info(f'[{run_ctx.name}] {"Committed" if is_succeeded else "Dropped"} watermarks of {run_name} '
+                             f'- {run_state}')
     ##### END - Methods to initiate TransferRun processing #####
 
 
@@ -495,15 +1250,27 @@ class BaseConnector(object):
         :return:
         """
         # Step 1 - Stage local tables @ /tmp/{data_source_id}/{config_id}/{run_id}/
-        local_prefix = self._opts.local_tmpdir.joinpath(
-            run_ctx.data_source_id, run_ctx.config_id, run_ctx.run_id or 'no_run_id'
-        )
+        local_prefix = self.local_prefix_for_transfer_run(run_ctx)
 
         self.logger.info(f'[{run_ctx.name}] Staging local => {local_prefix}')
-        local_table_ctxs = self.stage_tables_locally(run_ctx, local_prefix=local_prefix)
+        with tracing.span('stage_tables_locally'):
+            staged_table_ctxs = self.stage_tables_locally(run_ctx, local_prefix=local_prefix)
+
+        # Flatten, @partitioned_table_stager returns a list of TableContexts per table
+        local_table_ctxs = list()
+        for current_table_ctx in staged_table_ctxs:
+            if isinstance(current_table_ctx, TableContext):
+                local_table_ctxs.append(current_table_ctx)
+            else:
+                local_table_ctxs.extend(current_table_ctx)
+
+        # NOTE - Dev-only, local files are loaded straight into BigQuery so neither the bucket nor its location matter
+        if self._opts.bq_load_local:
+            return local_table_ctxs
 
         # Step 2 - Use regional GCS bucket and validate this is a valid bucket to stage data in
         gcs_bucket_name, gcs_prefix = helpers.parse_gcs_uri(self._opts.gcs_tmpdir)
+        quota.acquire(quota.API_GCS, 'get_bucket')
         gcs_bucket = self.gcs_client.get_bucket(gcs_bucket_name)
 
         # Validate that the chosen bucket is co-located with the BigQuery Dataset
@@ -511,23 +1278,36 @@ class BaseConnector(object):
         allowed_gcs_locations = BQ_DTS_LOCATION_TO_GCS_LOCATION_MAP.get(run_ctx.location_id) or set()
         assert gcs_bucket.location.lower() in allowed_gcs_locations
 
-        # Step 3 - Create GCS prefix @ {gcs_tmpdir}/{source}/{config}
-        gcs_run_prefix = self._opts.gcs_tmpdir.joinpath(run_ctx.data_source_id, run_ctx.config_id)
+        # Step 3 - Create GCS prefix @ {gcs_tmpdir}/{source}/{config}/{run_id}
+        gcs_run_prefix = self.gcs_prefix_for_transfer_run(run_ctx)
         self.logger.info(f'[{run_ctx.name}] Staging GCS path => {gcs_run_prefix}')
 
         # Step 4 - Upload local tables to GCS
         gcs_table_ctxs = list()
         for current_table_ctx in local_table_ctxs:
             self.logger.info(f'[{run_ctx.name}] Staging GCS table => {current_table_ctx.table_name}')
-            # Step 4a - Upload to GCS
-            gcs_uris = helpers.upload_multiple_files_to_gcs(self.gcs_client, current_table_ctx.uris,
-                local_prefix=local_prefix, gcs_prefix=gcs_run_prefix, overwrite=self._opts.gcs_overwrite)
+            # Step 4a - Upload to GCS, unless an earlier delivery of this run already did
+            uploaded_table = run_ctx.manifest.uploaded_table(current_table_ctx.table_name) if run_ctx.manifest else None
+            if uploaded_table:
+                self.logger.info(f'[{run_ctx.name}] Staging GCS table => {current_table_ctx.table_name} ; Already uploaded, skipping')
+                gcs_uris, gcs_checksums = uploaded_table
+            else:
+                gcs_checksums = dict()
+                with tracing.span('upload_table', table_name=current_table_ctx.table_name):
+                    gcs_uris = helpers.upload_multiple_files_to_gcs(self.gcs_client, current_table_ctx.uris,
+                        local_prefix=local_prefix, gcs_prefix=gcs_run_prefix, overwrite=self._opts.gcs_overwrite,
+                        checksums=gcs_checksums)
+
+                if run_ctx.manifest:
+                    run_ctx.manifest.mark_uploaded(current_table_ctx.table_name, gcs_uris, gcs_checksums)
 
             # Step 4b - Create TableContexts associating these GCS URIs with their schemas and table names
             out_ctx = TableContext(
                 imported_data_info=current_table_ctx.imported_data_info,
                 table_name=current_table_ctx.table_name,
-                uris=gcs_uris)
+                uris=gcs_uris,
+                compiled_idi=current_table_ctx.compiled_idi,
+                checksums=gcs_checksums)
 
             gcs_table_ctxs.append(out_ctx)
 
@@ -539,30 +1319,94 @@ class BaseConnector(object):
         :param local_prefix: Local directory within which to temporarily stage data
 
         :return: table_ctxs: List of collections.namedtuple('TableContext', ['table_name', 'tabledef', 'uris'])
+                             Items may also be lists of TableContexts, e.g. from @partitioned_table_stager
 
         table_name => Substituted from current_run (e.g. from mytable_{params.CustomerID}${run_date})
         tabledef => from self._idi_config[tabledef_name]
         uris => URIs to local files.  Wildcards are not expanded
         """
         raise NotImplementedError
+
+    def local_prefix_for_transfer_run(self, run_ctx: ManagedTransferRun):
+        # /tmp/{data_source_id}/{config_id}/{run_id}/
+        return self._opts.local_tmpdir.joinpath(run_ctx.data_source_id, run_ctx.config_id, run_ctx.run_id or 'no_run_id')
+
+    def gcs_prefix_for_transfer_run(self, run_ctx: ManagedTransferRun):
+        # {gcs_tmpdir}/{data_source_id}/{config_id}/{run_id}
+        # NOTE - Per run, so a GCS wildcard over this run's uploads never matches another run's, see consolidate_gcs_uris
+        return self._opts.gcs_tmpdir.joinpath(run_ctx.data_source_id, run_ctx.config_id, run_ctx.run_id or 'no_run_id')
+
+    def run_manifest_for_transfer_run(self, run_ctx: ManagedTransferRun) -> manifest.RunManifest:
+        # /tmp/{data_source_id}/{config_id}/{run_id}/_manifest.json
+        local_uri = self.local_prefix_for_transfer_run(run_ctx).joinpath(manifest.MANIFEST_FILENAME)
+
+        # {gcs_tmpdir}/{data_source_id}/{config_id}/{run_id}/_manifest.json
+        gcs_uri = None
+        if self._opts.run_manifest_gcs:
+            gcs_uri = self.gcs_prefix_for_transfer_run(run_ctx).joinpath(manifest.MANIFEST_FILENAME)
+
+        return manifest.RunManifest(run_ctx.name, local_uri, gcs_client=self.gcs_client if gcs_uri else None,
+                                    gcs_uri=gcs_uri)
     ##### END - Methods to stage requested data #####
 
 
     ##### BEGIN - Methods for loading data into BigQuery #####
     def start_bigquery_jobs_via_dts_apis(self, run_ctx: ManagedTransferRun, gcs_table_ctxs: List[TableContext]):
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rpc/google.cloud.bigquery.datatransfer.v1#google.cloud.bigquery.datatransfer.v1.ImportedDataInfo
-        # Step 1 - Prepare the body for "start_big_query_jobs"
+        # Step 1 - Prepare the ImportedDataInfos for "start_big_query_jobs"
         current_run_idis = []
         for current_table_ctx in gcs_table_ctxs:
             self.logger.info(f'[{run_ctx.name}] BQ DTS ; {current_table_ctx.table_name}')
+
+            # Step 1a - Collapse many shards into a single wildcard URI when a GCS listing allows it
+            if self._opts.gcs_wildcard_min_uris and len(current_table_ctx.uris) >= self._opts.gcs_wildcard_min_uris:
+                wildcard_uris = helpers.consolidate_gcs_uris(self.gcs_client, current_table_ctx.uris)
+                if len(wildcard_uris) < len(current_table_ctx.uris):
+                    self.logger.info(f'[{run_ctx.name}] BQ DTS ; {current_table_ctx.table_name} ; '
+                                     f'{len(current_table_ctx.uris)} URIs => {wildcard_uris[0]}')
+                    current_table_ctx = TableContext(
+                        imported_data_info=current_table_ctx.imported_data_info,
+                        table_name=current_table_ctx.table_name,
+                        uris=wildcard_uris,
+                        compiled_idi=current_table_ctx.compiled_idi,
+                        checksums=current_table_ctx.checksums)
+
             table_idi = current_table_ctx.to_ImportedDataInfo()
             current_run_idis.append(table_idi)
 
-        body = dict(importedData=current_run_idis)
+        # Step 2 - Split into size-bounded startBigQueryJobs requests
+        idi_chunks = helpers.chunk_by_size(current_run_idis, lambda current_idi: len(json.dumps(current_idi)),
+                                           self._opts.dts_max_request_kb * 1024,
+                                           max_chunk_len=self._opts.dts_max_tables_per_request)
+
+        def start_chunk(chunk_idx, chunk_idis):
+            # NOTE - Requests sent by an earlier delivery of this run are not re-sent, avoiding duplicate loads
+            if run_ctx.manifest and run_ctx.manifest.is_chunk_started(chunk_idis):
+                self.logger.info(f'[{run_ctx.name}] BQ DTS ; Starting BigQuery Jobs ; '
+                                 f'Request {chunk_idx + 1}/{len(idi_chunks)} ; Already started, skipping')
+                return
+
+            self.logger.info(f'[{run_ctx.name}] BQ DTS ; Starting BigQuery Jobs ; '
+                             f'Request {chunk_idx + 1}/{len(idi_chunks)} ; {len(chunk_idis)} tables')
+            run_ctx.dts_client.transfer_run_start_big_query_jobs(run_ctx.name, body=dict(importedData=chunk_idis))
+
+            if run_ctx.manifest:
+                run_ctx.manifest.mark_chunk_started(chunk_idis)
+
+        # Step 3 - Trigger startBigQueryJobs, concurrently across requests when allowed
+        if len(idi_chunks) <= 1 or self._opts.dts_start_jobs_concurrency <= 1:
+            for chunk_idx, chunk_idis in enumerate(idi_chunks):
+                start_chunk(chunk_idx, chunk_idis)
+            return
+
+        max_workers = min(self._opts.dts_start_jobs_concurrency, len(idi_chunks))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunk_futures = [executor.submit(tracing.wrap(start_chunk), chunk_idx, chunk_idis)
+                             for chunk_idx, chunk_idis in enumerate(idi_chunks)]
 
-        # Step 2 - Trigger a single startBigQueryJobs call
-        self.logger.info(f'[{run_ctx.name}] BQ DTS ; Starting BigQuery Jobs')
-        run_ctx.dts_client.transfer_run_start_big_query_jobs(run_ctx.name, body=body)
+            # NOTE - Raises the first failure, after every request has completed
+            for chunk_future in chunk_futures:
+                chunk_future.result()
 
     def start_bigquery_jobs_via_bq_apis(self, run_ctx: ManagedTransferRun, gcs_table_ctxs: List[TableContext]):
         """
@@ -574,39 +1418,106 @@ class BaseConnector(object):
         """
         # Step 1 - Ensure the target Dataset exists
         dataset_id = run_ctx.transfer_run['destination_dataset_id']
-
-        # Step 2 - Trigger multiple BigQuery Load jobs based on the ImportedDataInfo
         for current_table_ctx in gcs_table_ctxs:
             assert 'sql' not in current_table_ctx.imported_data_info, 'SQL not supported by SDK at this time'
 
-            load_job = helpers.load_bigquery_table_via_bq_apis(self.bq_client,
-                dataset_id, current_table_ctx.table_name, current_table_ctx.imported_data_info, current_table_ctx.uris)
-            self.logger.info(f'[{run_ctx.name}] BQ Load ; {current_table_ctx.table_name} => {load_job.job_id}')
+        def submit_load_jobs(current_table_ctx):
+            # Re-use the schema and load job config compiled from the connector config
+            compiled_idi = current_table_ctx.compiled_idi
+            if self._opts.bq_load_local:
+                load_jobs = helpers.load_bigquery_table_from_local_files(self.bq_client,
+                    dataset_id, current_table_ctx.table_name, current_table_ctx.imported_data_info, current_table_ctx.uris,
+                    schema=compiled_idi.bq_schema if compiled_idi else None,
+                    max_workers=self._opts.bq_load_concurrency, timeout_secs=self._opts.bq_load_timeout_secs)
+            else:
+                load_jobs = [helpers.load_bigquery_table_via_bq_apis(self.bq_client,
+                    dataset_id, current_table_ctx.table_name, current_table_ctx.imported_data_info, current_table_ctx.uris,
+                    schema=compiled_idi.bq_schema if compiled_idi else None,
+                    job_config=compiled_idi.load_job_config if compiled_idi else None,
+                    run_name=run_ctx.name, checksums=current_table_ctx.checksums)]
+
+            load_job_ids = [load_job.job_id for load_job in load_jobs]
+            self.logger.info(f'[{run_ctx.name}] BQ Load ; {current_table_ctx.table_name} => {load_job_ids}')
+            return load_jobs
+
+        # Step 2 - Trigger multiple BigQuery Load jobs based on the ImportedDataInfo, concurrently
+        load_results = dict()
+        load_jobs_by_table = dict()
+        max_workers = max(1, min(self._opts.bq_load_concurrency, len(gcs_table_ctxs)))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            submit_futures = {
+                current_table_ctx.table_name: executor.submit(tracing.wrap(submit_load_jobs), current_table_ctx)
+                for current_table_ctx in gcs_table_ctxs
+            }
+
+        for table_name, submit_future in submit_futures.items():
+            try:
+                load_jobs_by_table[table_name] = submit_future.result()
+            except Exception as submit_error:
+                self.logger.error(f'[{run_ctx.name}] BQ Load ; {table_name} ; Failed to submit - {submit_error!r}')
+                load_results[table_name] = dict(state='NOT_STARTED', error_result=repr(submit_error))
+
+        # Step 3 - Wait on every submitted job from a single poller
+        all_load_jobs = [load_job for load_jobs in load_jobs_by_table.values() for load_job in load_jobs]
+        with tracing.span('bigquery.wait_for_jobs', job_count=len(all_load_jobs)):
+            helpers.wait_for_bigquery_jobs(all_load_jobs, self._opts.bq_load_timeout_secs)
+
+        # Step 4 - Record per-table outcomes, the run fails if any load failed
+        for table_name, load_jobs in load_jobs_by_table.items():
+            load_results[table_name] = helpers.load_jobs_to_result_dict(load_jobs)
+            self.logger.info(f'[{run_ctx.name}] BQ Load ; {table_name} => {load_results[table_name]}')
+
+        run_ctx.metrics['loads'] = load_results
+
+        failed_tables = sorted(
+            table_name for table_name, load_result in load_results.items() if load_result.get('error_result')
+        )
+        if failed_tables:
+            raise RuntimeError(f'BigQuery loads failed for {len(failed_tables)}/{len(load_results)} tables - {failed_tables}')
     ##### END - Methods for self-managed loads #####
 
     @property
     def ps_sub_client(self):
         if not self._ps_sub_client:
+            from google.cloud import pubsub
             self._ps_sub_client = pubsub.SubscriberClient(credentials=self._credentials)
         return self._ps_sub_client
 
     @property
     def gcs_client(self):
         if not self._gcs_client:
+            from google.cloud import storage
             self._gcs_client = storage.Client(credentials=self._credentials)
         return self._gcs_client
 
     @property
     def bq_client(self):
         if not self._bq_client:
+            from google.cloud import bigquery
             self._bq_client = bigquery.Client(credentials=self._credentials)
         return self._bq_client
 
+    @property
+    def watermark_store(self):
+        if not self._opts.watermark_store:
+            return None
+
+        if not self._watermark_store:
+            if watermarks.is_gcs_store_uri(self._opts.watermark_store):
+                self._watermark_store = watermarks.GCSWatermarkStore(self.gcs_client, self._opts.watermark_store)
+            else:
+                self._watermark_store = watermarks.SQLiteWatermarkStore(self._opts.watermark_store)
+        return self._watermark_store
+
     @property
     def dts_client(self):
         if self._is_testing:
             return None
 
         if not self._dts_client:
-            self._dts_client = rest_client.PartnerDTSClient(credentials=self._credentials)
+            dts_client_cls = rest_client.DTS_BACKEND_TO_CLIENT_CLS_MAP[self._opts.dts_backend]
+            self._dts_client = dts_client_cls(credentials=self._credentials, pool_size=self._opts.dts_http_pool_size,
+                                              batch_linger_secs=self._opts.dts_batch_linger_ms / 1000.0,
+                                              retry_policy=rest_client.RetryPolicy(max_attempts=self._opts.dts_max_attempts),
+                                              credentials_ttl_secs=self._opts.dts_credentials_ttl_secs)
         return self._dts_client
@@ -0,0 +1,182 @@
+# Copyright 2018 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Connector config (see example/calendar_connector.yaml) compiled once per process
+
+Everything derivable from the config alone - param sets, ImportedDataInfo bodies, BigQuery schemas and load job
+configs, table name formatters - is built here, so per-run work is only parameter substitution.
+"""
+
+import collections
+import functools
+import hashlib
+import json
+import os
+import stat
+import string
+import tempfile
+
+from bq_dts import helpers
+from bq_dts import rest_client
+
+_formatter = string.Formatter()
+
+
+@functools.lru_cache(maxsize=1)
+def _safe_yaml():
+    # NOTE - Deferred import, ruamel.yaml is slow to import and unused on config cache hits
+    from ruamel.yaml import YAML
+    return YAML(typ='safe')
+
+
+def yaml_load(stream):
+    return _safe_yaml().load(stream)
+
+
+def _is_private_dir(dir_uri):
+    """True if dir_uri is owned by the current user and writable by no one else"""
+    dir_stat = os.stat(dir_uri)
+    return dir_stat.st_uid == os.getuid() and not dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def load_raw_config(config_path, cache_dir=None):
+    """
+    Parse the connector config YAML, optionally via a JSON cache in cache_dir keyed by the file's sha256
+
+    The cache is skipped unless cache_dir is private to the current user, e.g. not a shared /tmp
+    """
+    with open(config_path, 'rb') as config_fp:
+        raw_bytes = config_fp.read()
+
+    if not cache_dir:
+        return yaml_load(raw_bytes.decode('utf-8'))
+
+    # Step 1 - Only trust a cache directory no one else can plant files in
+    os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+    if not _is_private_dir(cache_dir):
+        return yaml_load(raw_bytes.decode('utf-8'))
+
+    # Step 2 - Cache hit, skip YAML parsing entirely
+    cache_uri = os.path.join(cache_dir, f'{hashlib.sha256(raw_bytes).hexdigest()}.json')
+    try:
+        with open(cache_uri, 'r') as cache_fp:
+            return json.load(cache_fp)
+    except (OSError, ValueError):
+        pass
+
+    # Step 3 - Cache miss, parse and write atomically so concurrent workers never read a partial file
+    raw_config = yaml_load(raw_bytes.decode('utf-8'))
+
+    # NOTE - Only cache configs JSON round-trips exactly, e.g. not YAML timestamps or non-string keys
+    raw_config_str = json.dumps(raw_config, default=str)
+    if json.loads(raw_config_str) != raw_config:
+        return raw_config
+
+    tmp_fd, tmp_uri = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    with os.fdopen(tmp_fd, 'w') as tmp_fp:
+        tmp_fp.write(raw_config_str)
+    os.replace(tmp_uri, cache_uri)
+
+    return raw_config
+
+
+class TableNameFormatter(object):
+    """
+    Table name template, e.g. "mytable_{CustomerID}${run_yyyymmmdd}", parsed once
+
+    Fields resolve against TransferRun params plus "run_time", "run_yyyymmmdd" and "user_id"
+    """
+    def __init__(self, table_template):
+        self.table_template = table_template
+        self._parsed_template = list(_formatter.parse(table_template))
+
+    def format(self, transfer_run):
+        run_time = transfer_run['run_time']
+        run_fields = dict(run_time=run_time, run_yyyymmmdd=f'{run_time:%Y%m%d}', user_id=transfer_run['user_id'])
+
+        # NOTE - ChainMap instead of copying params, run fields win over params of the same name
+        table_params = collections.ChainMap(run_fields, transfer_run['params'] or dict())
+
+        table_name_parts = list()
+        for literal_text, field_name, format_spec, conversion in self._parsed_template:
+            table_name_parts.append(literal_text)
+            if field_name is None:
+                continue
+
+            field_value, _ = _formatter.get_field(field_name, (), table_params)
+            field_value = _formatter.convert_field(field_value, conversion)
+            table_name_parts.append(_formatter.format_field(field_value, format_spec or ''))
+
+        return ''.join(table_name_parts)
+
+
+class CompiledImportedDataInfo(object):
+    """
+    One entry of the config's "imported_data_info" section
+
+    BigQuery schema and load job config are only needed for --transfer-run-yaml loads, so are built on first use
+    """
+    def __init__(self, name, imported_data_info):
+        self.name = name
+        self.imported_data_info = imported_data_info
+
+        table_template = imported_data_info.get('destination_table_id_template')
+        self.table_formatter = TableNameFormatter(table_template) if table_template else None
+
+        self.idi_template = None
+        if imported_data_info.get('table_defs'):
+            self.idi_template = rest_client.ImportedDataInfoTemplate(imported_data_info)
+
+        self._bq_schema = None
+        self._load_job_config = None
+
+    @property
+    def bq_schema(self):
+        if self._bq_schema is None:
+            self._bq_schema = helpers.RPCRecordSchema_to_GCloudSchema(self.imported_data_info['table_defs'][0]['schema'])
+        return self._bq_schema
+
+    @property
+    def load_job_config(self):
+        if self._load_job_config is None:
+            self._load_job_config = helpers.DTSTableDefinition_to_BQLoadJobConfig(
+                self.imported_data_info['table_defs'][0], schema=self.bq_schema)
+        return self._load_job_config
+
+
+class ConnectorConfig(object):
+    def __init__(self, raw_config):
+        self.raw_config = raw_config
+
+        # Step 1 - Data Source Definition parsing
+        self.data_source = raw_config['data_source_definition']['data_source']
+        # If there are no parameters create one to avoid a null check.
+        self.data_source['parameters'] = self.data_source['parameters'] or dict()
+
+        self.required_params = {
+            current_param['param_id'] for current_param in self.data_source['parameters'] if current_param.get('required')
+        }
+        self.integer_params = {
+            current_param['param_id'] for current_param in self.data_source['parameters'] if current_param['type'] == 'INTEGER'
+        }
+
+        # Step 2 - ImportedDataInfo compilation
+        self.imported_data_infos = {
+            idi_config_name: CompiledImportedDataInfo(idi_config_name, current_idi)
+            for idi_config_name, current_idi in (raw_config.get('imported_data_info') or dict()).items()
+        }
+
+    def __getitem__(self, key):
+        return self.raw_config[key]
@@ -12,19 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections
+import concurrent.futures
 import copy
+import cProfile
 import datetime
+import gc
 import gzip
-import math
+import hashlib
 import json
+import os
 import re
+import resource
+import sys
 import threading
 import time
+import tracemalloc
 from typing import Dict
 
-from google.cloud import bigquery
-from google.cloud import exceptions
-from google.cloud.bigquery import LoadJobConfig
+# NOTE - google.cloud.bigquery and protobuf_to_dict are imported where used, they dominate import time
+from bq_dts import quota
+from bq_dts import tracing
 
 
 class RepeatedTimer(object):
@@ -84,11 +92,22 @@ class GzippedJSONWriter(object):
     """
     def __init__(self, filename):
         self._fp = gzip.open(filename, 'wt')
+        self._flush_generation = _memory_pressure.flush_generation
 
     def write(self, data: Dict):
         _json_dump(data, self._fp)
         self._fp.write(NEWLINE)
 
+        # Flush once per MemoryGuard request, from the writing thread
+        if self._flush_generation != _memory_pressure.flush_generation:
+            self._flush_generation = _memory_pressure.flush_generation
+            self.flush()
+
+    def flush(self):
+        # Push buffered/compressed data to disk, so dirty pages stop counting against the pod memory limit
+        self._fp.flush()
+        os.fsync(self._fp.buffer.fileobj.fileno())
+
     def read(self, bytes=None):
         raise NotImplementedError
 
@@ -101,12 +120,357 @@ class GzippedJSONWriter(object):
 ############################# END - JSON Helpers ############################
 
 
+##### BEGIN - Profiling Helpers #####
+DEFAULT_PROFILE_SAMPLE_SECS = 0.01
+
+# NOTE - cProfile allows one active profiler per process, enabling a second raises on Python 3.12+
+_profiler_lock = threading.Lock()
+
+
+class RunProfiler(object):
+    """
+    Opt-in CPU profiler for the calling thread, used to profile a single TransferRun
+
+    Only one run is profiled at a time per process - while another is, is_profiling is False and nothing is written
+
+    Writes 2 artifacts to output_dir on exit
+    * {name}.pstats - Deterministic cProfile stats, readable via "python -m pstats" or snakeviz
+    * {name}.collapsed - Sampled stacks in collapsed format, readable via flamegraph.pl or speedscope
+
+    Example usage
+
+    with RunProfiler(local_prefix.joinpath('_profile'), 'my_run_id') as profiler:
+        do_work()
+
+    profiler.output_uris
+    """
+    def __init__(self, output_dir, name, sample_secs=DEFAULT_PROFILE_SAMPLE_SECS):
+        self.output_dir = output_dir
+        self.name = name
+        self.sample_secs = sample_secs
+        self.output_uris = list()
+        self.is_profiling = False
+
+        self._profile = cProfile.Profile()
+        self._stack_counts = collections.Counter()
+        self._target_thread_id = None
+        self._sampler = None
+        self._stop_sampling = threading.Event()
+
+    def _sample_stacks(self):
+        while not self._stop_sampling.wait(self.sample_secs):
+            frame = sys._current_frames().get(self._target_thread_id)
+            if frame is None:
+                continue
+
+            stack = list()
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+
+            self._stack_counts[';'.join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self.is_profiling = _profiler_lock.acquire(blocking=False)
+        if not self.is_profiling:
+            return self
+
+        self._target_thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample_stacks, name=f'RunProfiler-{self.name}', daemon=True)
+        self._sampler.start()
+
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if not self.is_profiling:
+            return
+
+        try:
+            self._profile.disable()
+            self._stop_sampling.set()
+            self._sampler.join()
+        finally:
+            _profiler_lock.release()
+
+        # Step 1 - Write out deterministic profile stats
+        self.output_dir.makedirs_p()
+        pstats_uri = self.output_dir.joinpath(f'{self.name}.pstats')
+        self._profile.dump_stats(pstats_uri)
+
+        # Step 2 - Write out sampled stacks, one "frame;frame;frame count" line per unique stack
+        collapsed_uri = self.output_dir.joinpath(f'{self.name}.collapsed')
+        with open(collapsed_uri, 'w') as collapsed_fp:
+            for stack, count in self._stack_counts.most_common():
+                collapsed_fp.write(f'{stack} {count}{NEWLINE}')
+
+        self.output_uris = [pstats_uri, collapsed_uri]
+##### END - Profiling Helpers #####
+
+
+##### BEGIN - Memory Helpers #####
+BYTES_PER_MB = 1024 * 1024
+DEFAULT_MEMORY_CHECK_SECS = 1.0
+DEFAULT_RSS_SAMPLE_SECS = 0.05
+DEFAULT_TRACEMALLOC_FRAMES = 1
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+class _MemoryPressure(object):
+    # Bumped by MemoryGuard, GzippedJSONWriters flush when this changes
+    flush_generation = 0
+
+_memory_pressure = _MemoryPressure()
+
+
+def peak_rss_bytes():
+    """High-water mark of this process' RSS.  NOTE - ru_maxrss is in KB on Linux, bytes on Mac OS X"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def current_rss_bytes():
+    """Current RSS of this process, falls back to peak_rss_bytes() where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as statm_fp:
+            return int(statm_fp.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+class _RSSSampler(object):
+    """
+    One background thread sampling RSS while any MemoryPhase is open, each phase keeping its own maximum
+
+    NOTE - Sampled rather than read from ru_maxrss / VmHWM, which are per process and can't be reset per phase when
+    runs overlap.  Spikes shorter than sample_secs may be missed.
+    """
+    def __init__(self, sample_secs=DEFAULT_RSS_SAMPLE_SECS):
+        self.sample_secs = sample_secs
+
+        self._lock = threading.Lock()
+        self._open_phases = set()
+        self._thread = None
+
+    def add(self, memory_phase):
+        with self._lock:
+            self._open_phases.add(memory_phase)
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+                self._thread.start()
+
+    def remove(self, memory_phase):
+        with self._lock:
+            self._open_phases.discard(memory_phase)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._open_phases:
+                    self._thread = None
+                    return
+                open_phases = list(self._open_phases)
+
+            rss = current_rss_bytes()
+            for memory_phase in open_phases:
+                memory_phase.observe_rss(rss)
+            time.sleep(self.sample_secs)
+
+_rss_sampler = _RSSSampler()
+
+
+class MemoryPhase(object):
+    """
+    Memory watermarks for a block of code, the RSS high-water mark is sampled for this block alone
+
+    with MemoryPhase('staging', tracemalloc_top=10) as phase:
+        do_work()
+
+    phase.to_dict()
+    """
+    def __init__(self, name, tracemalloc_top=0):
+        self.name = name
+        self.tracemalloc_top = tracemalloc_top if tracemalloc.is_tracing() else 0
+
+        self.time_start = None
+        self.duration_secs = None
+        self.rss_start = None
+        self.rss_end = None
+        self.rss_hwm = None
+        self.top_allocators = list()
+
+        self._snapshot_start = None
+
+    def __enter__(self):
+        if self.tracemalloc_top:
+            self._snapshot_start = tracemalloc.take_snapshot()
+
+        self.rss_start = self.rss_hwm = current_rss_bytes()
+        self.time_start = time.time()
+        _rss_sampler.add(self)
+        return self
+
+    def observe_rss(self, rss):
+        self.rss_hwm = max(self.rss_hwm, rss)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _rss_sampler.remove(self)
+        self.duration_secs = time.time() - self.time_start
+        self.rss_end = current_rss_bytes()
+        self.observe_rss(self.rss_end)
+
+        if self.tracemalloc_top:
+            snapshot_end = tracemalloc.take_snapshot()
+            stat_diffs = snapshot_end.compare_to(self._snapshot_start, 'lineno')
+            self.top_allocators = [str(current_diff) for current_diff in stat_diffs[:self.tracemalloc_top]]
+            self._snapshot_start = None
+
+    def to_dict(self):
+        return dict(
+            duration_secs=round(self.duration_secs, 3),
+            rss_start_mb=round(self.rss_start / BYTES_PER_MB, 1),
+            rss_end_mb=round(self.rss_end / BYTES_PER_MB, 1),
+            rss_hwm_mb=round(self.rss_hwm / BYTES_PER_MB, 1),
+            top_allocators=self.top_allocators
+        )
+
+
+class MemoryGuard(object):
+    """
+    Periodically compares RSS against a soft limit, set below the pod's hard memory limit
+
+    When over the soft limit...
+    1) Runs a GC pass and asks every open GzippedJSONWriter to flush
+    2) Closes the gate checked by wait_for_headroom() until RSS drops back below the soft limit
+    """
+    def __init__(self, soft_limit_bytes, check_secs=DEFAULT_MEMORY_CHECK_SECS, logger=None):
+        self.soft_limit_bytes = soft_limit_bytes
+        self.logger = logger
+
+        self._has_headroom = threading.Event()
+        self._has_headroom.set()
+        self._timer = RepeatedTimer(check_secs, self.check)
+
+    @property
+    def has_headroom(self):
+        return self._has_headroom.is_set()
+
+    def check(self):
+        if current_rss_bytes() < self.soft_limit_bytes:
+            self._has_headroom.set()
+            return True
+
+        # Step 1 - Try to free memory before closing the gate
+        gc.collect()
+        _memory_pressure.flush_generation += 1
+
+        rss = current_rss_bytes()
+        if rss < self.soft_limit_bytes:
+            self._has_headroom.set()
+            return True
+
+        # Step 2 - Still over, stop taking on new work
+        if self._has_headroom.is_set() and self.logger:
+            self.logger.warning(f'RSS {rss / BYTES_PER_MB:.1f}MB over soft limit '
+                                f'{self.soft_limit_bytes / BYTES_PER_MB:.1f}MB ; Pausing intake')
+        self._has_headroom.clear()
+        return False
+
+    def wait_for_headroom(self, timeout=None):
+        return self._has_headroom.wait(timeout)
+
+    def start(self):
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+##### END - Memory Helpers #####
+
+
+##### BEGIN - Chunking Helpers #####
+def chunk_by_size(items, size_fxn, max_chunk_size, max_chunk_len=0):
+    """
+    Split items into consecutive chunks whose size_fxn() totals stay within max_chunk_size
+
+    An item larger than max_chunk_size gets a chunk to itself.  max_chunk_len > 0 also caps items per chunk.
+    """
+    chunks = list()
+    current_chunk = list()
+    current_chunk_size = 0
+
+    for current_item in items:
+        item_size = size_fxn(current_item)
+        is_full = bool(max_chunk_len and len(current_chunk) >= max_chunk_len)
+        if current_chunk and (is_full or current_chunk_size + item_size > max_chunk_size):
+            chunks.append(current_chunk)
+            current_chunk = list()
+            current_chunk_size = 0
+
+        current_chunk.append(current_item)
+        current_chunk_size += item_size
+
+    if current_chunk:
+        chunks.append(current_chunk)
+
+    return chunks
+
+
+def split_date_range(min_date, max_date, partition_days=1):
+    """
+    Split [min_date, max_date] inclusive into consecutive (partition_start, partition_end) of partition_days each
+
+    Dates may be datetime.date, datetime.datetime or 'YYYY-MM-DD' strings
+    """
+    min_date, max_date = _to_date(min_date), _to_date(max_date)
+    assert min_date <= max_date, f'{min_date} > {max_date}'
+
+    partition_offset = datetime.timedelta(days=partition_days)
+    partition_start = min_date
+    while partition_start <= max_date:
+        partition_end = min(partition_start + partition_offset - datetime.timedelta(days=1), max_date)
+        yield partition_start, partition_end
+        partition_start += partition_offset
+
+
+def _to_date(date_value):
+    if isinstance(date_value, datetime.datetime):
+        return date_value.date()
+    if isinstance(date_value, datetime.date):
+        return date_value
+    return datetime.datetime.strptime(date_value, '%Y-%m-%d').date()
+##### END - Chunking Helpers #####
+
+
 ##### BEGIN - GCS Helpers #####
 GCS_URI_PARSER = re.compile('gs://(.*?)/(.*?)$')
+GCS_MEDIA_UPLOAD_URL_TEMPLATE = 'https://www.googleapis.com/upload/storage/v1/b/{gcs_bucket}/o'
 def parse_gcs_uri(current_str):
     return GCS_URI_PARSER.match(current_str).groups()
 
-def upload_multiple_files_to_gcs(gcs_client, local_uris, local_prefix=None, gcs_prefix=None, overwrite=False):
+
+class _InflightUploads(object):
+    # Bytes of local files currently being uploaded to GCS by this process, see inflight_upload_bytes()
+    lock = threading.Lock()
+    total_bytes = 0
+
+_inflight_uploads = _InflightUploads()
+
+
+def inflight_upload_bytes():
+    return _inflight_uploads.total_bytes
+
+
+def _add_inflight_upload_bytes(delta_bytes):
+    with _inflight_uploads.lock:
+        _inflight_uploads.total_bytes += delta_bytes
+
+def upload_multiple_files_to_gcs(gcs_client, local_uris, local_prefix=None, gcs_prefix=None, overwrite=False,
+                                 checksums=None):
+    """
+    :param checksums: Optional dict, filled with {gcs_uri: base64 MD5} as reported by GCS
+    """
     gcs_bucket_cache = dict()
     output_gcs_uris = list()
 
@@ -123,20 +487,91 @@ def upload_multiple_files_to_gcs(gcs_client, local_uris, local_prefix=None, gcs_
         # Step 3 - Fetch the target GCS bucket
         bucket_obj = gcs_bucket_cache.get(gcs_bucket)
         if not bucket_obj:
+            quota.acquire(quota.API_GCS, 'get_bucket')
             bucket_obj = gcs_client.get_bucket(gcs_bucket)
             gcs_bucket_cache[gcs_bucket] = bucket_obj
 
-        # Step 4 - Check if the GCS Blob exists
-        blob_obj = bucket_obj.blob(gcs_blob)
+        # Step 4 - Check if the GCS Blob exists, fetching its metadata
+        blob_obj = None
+        if not overwrite:
+            quota.acquire(quota.API_GCS, 'get_blob')
+            blob_obj = bucket_obj.get_blob(gcs_blob)
 
-        if not blob_obj.exists() or overwrite:
+        if blob_obj is None:
             # Step 5 - Upload the file
-            blob_obj.upload_from_filename(filename=current_uri)
+            blob_obj = bucket_obj.blob(gcs_blob)
+            quota.acquire(quota.API_GCS, 'upload')
+
+            upload_bytes = os.path.getsize(current_uri)
+            _add_inflight_upload_bytes(upload_bytes)
+            try:
+                with tracing.span('gcs.upload', uri=gcs_uri):
+                    blob_obj.upload_from_filename(filename=current_uri)
+            finally:
+                _add_inflight_upload_bytes(-upload_bytes)
+
+        if checksums is not None:
+            checksums[gcs_uri] = blob_obj.md5_hash
 
         # Step 6 - Keep track of the new GCS URIs
         output_gcs_uris.append(gcs_uri)
 
     return output_gcs_uris
+
+
+def upload_string_to_gcs_if_generation_match(gcs_client, gcs_uri, data_str, generation,
+                                             content_type='application/json'):
+    """
+    Upload data_str only while the object is still at generation - 0 to only create it
+
+    NOTE - google-cloud-storage 1.8 has no upload preconditions, so this calls the JSON API's media upload directly
+    :return: False if the precondition failed, i.e. another writer got there first
+    """
+    gcs_bucket, gcs_blob = parse_gcs_uri(gcs_uri)
+    upload_resp = gcs_client._http.request(
+        'POST', GCS_MEDIA_UPLOAD_URL_TEMPLATE.format(gcs_bucket=gcs_bucket),
+        params=dict(uploadType='media', name=gcs_blob, ifGenerationMatch=str(generation)),
+        data=data_str.encode('utf-8'), headers={'Content-Type': content_type})
+    if upload_resp.status_code == 412:
+        return False
+
+    upload_resp.raise_for_status()
+    return True
+
+
+def consolidate_gcs_uris(gcs_client, gcs_uris):
+    """
+    ['gs://b/t/part-0.json', 'gs://b/t/part-1.json'] => ['gs://b/t/part-*.json']
+
+    The wildcard is only used when a GCS listing proves it matches exactly gcs_uris, otherwise gcs_uris is returned.
+    BQ DTS resolves the wildcard later, so gcs_uris must sit under a prefix nothing else writes to, e.g. one per run.
+    """
+    if len(gcs_uris) < 2 or any('*' in current_uri for current_uri in gcs_uris):
+        return gcs_uris
+
+    # Step 1 - Longest common prefix and suffix, without overlapping
+    uri_prefix = os.path.commonprefix(gcs_uris)
+    uri_remainders = [current_uri[len(uri_prefix):][::-1] for current_uri in gcs_uris]
+    uri_suffix = os.path.commonprefix(uri_remainders)[::-1]
+
+    uri_match = GCS_URI_PARSER.match(uri_prefix)
+    if not uri_match or '/' in uri_suffix:
+        return gcs_uris
+
+    # Step 2 - Verify the wildcard matches nothing else, e.g. files from other runs under the same prefix
+    gcs_bucket, blob_prefix = uri_match.groups()
+    quota.acquire(quota.API_GCS, 'list_blobs')
+    with tracing.span('gcs.list', prefix=uri_prefix):
+        listed_uris = {
+            f'gs://{gcs_bucket}/{current_blob.name}'
+            for current_blob in gcs_client.bucket(gcs_bucket).list_blobs(prefix=blob_prefix)
+            if current_blob.name.endswith(uri_suffix)
+        }
+
+    if listed_uris != set(gcs_uris):
+        return gcs_uris
+
+    return [f'{uri_prefix}*{uri_suffix}']
 ##### END - GCS Helpers #####
 
 
@@ -167,8 +602,7 @@ def normalize_transfer_run(transfer_run, integer_params=None):
     out_params = protobuf_struct_to_python_dict(out_transfer_run['params'])
 
     # Step 2 - For BQ DTS specifically, cast explicit params to integers
-    for int_param in integer_params:
-        out_params[int_param] = int(out_params[int_param])
+    cast_integer_params(out_params, integer_params)
 
     out_transfer_run['params'] = out_params
 
@@ -179,6 +613,63 @@ def normalize_transfer_run(transfer_run, integer_params=None):
     return out_transfer_run
 
 
+def decode_transfer_run(transfer_run_obj, integer_params=None):
+    """
+    Fast path for bigquery_datatransfer.types.TransferRun => normalized TransferRun dict
+
+    Equivalent to normalize_transfer_run(protobuf_to_dict(transfer_run_obj, use_enum_labels=True)), without the
+    intermediate dict, the deep copy or float math on timestamps
+
+    :param transfer_run_obj:
+    :param integer_params:
+    :return:
+    """
+    out_transfer_run = dict()
+    for field_desc, field_value in transfer_run_obj.ListFields():
+        field_name = field_desc.name
+        if field_name == 'params':
+            out_transfer_run[field_name] = protobuf_struct_message_to_python_dict(field_value)
+        elif field_name in TRANSFER_RUN_TIMESTAMP_FIELDS:
+            out_transfer_run[field_name] = _to_datetime(field_value.seconds, field_value.nanos)
+        elif field_desc.enum_type is not None:
+            out_transfer_run[field_name] = field_desc.enum_type.values_by_number[field_value].name
+        elif field_desc.message_type is not None:
+            from protobuf_to_dict import protobuf_to_dict
+            out_transfer_run[field_name] = protobuf_to_dict(field_value, use_enum_labels=True)
+        else:
+            out_transfer_run[field_name] = field_value
+
+    # NOTE - Matches normalize_transfer_run, where an unset/empty Struct becomes None
+    out_transfer_run['params'] = out_transfer_run.get('params') or None
+    if integer_params:
+        cast_integer_params(out_transfer_run['params'], integer_params)
+
+    return out_transfer_run
+
+
+def cast_integer_params(params, integer_params):
+    for int_param in integer_params or list():
+        params[int_param] = int(params[int_param])
+
+
+def protobuf_struct_message_to_python_dict(struct_obj):
+    # https://developers.google.com/protocol-buffers/docs/reference/google.protobuf#struct
+    return {var_name: _value_message_to_python_value(var_value) for var_name, var_value in struct_obj.fields.items()}
+
+
+def _value_message_to_python_value(value_obj):
+    # https://developers.google.com/protocol-buffers/docs/reference/google.protobuf#value
+    value_kind = value_obj.WhichOneof('kind')
+    if value_kind == 'struct_value':
+        return protobuf_struct_message_to_python_dict(value_obj.struct_value)
+    elif value_kind == 'list_value':
+        return [_value_message_to_python_value(current_item) for current_item in value_obj.list_value.values]
+    elif value_kind is None or value_kind == 'null_value':
+        return None
+
+    return getattr(value_obj, value_kind)
+
+
 def protobuf_struct_to_python_dict(raw_struct):
     # https://developers.google.com/protocol-buffers/docs/reference/google.protobuf#struct
     if raw_struct is None:
@@ -208,15 +699,21 @@ VALUE_TO_PYTHON_VALUE_MAP = {
     'list_value': lambda value: [_struct_value_to_python_value(current_item) for current_item in value]
 }
 
-NANOSECONDS = math.pow(10, -9)
+EPOCH = datetime.datetime(1970, 1, 1)
+NANOSECONDS_PER_MICROSECOND = 1000
 def rpc_timestamp_to_datetime(in_timestamp):
-    second_from_epoch = float(in_timestamp['seconds'])
-    second_from_epoch += float(in_timestamp.get('nanos', 0.0) * NANOSECONDS)
-    return datetime.datetime.utcfromtimestamp(second_from_epoch)
+    return _to_datetime(in_timestamp['seconds'], in_timestamp.get('nanos', 0))
+
+
+def _to_datetime(seconds, nanos):
+    # NOTE - Integer math, float seconds lose microsecond precision for present-day timestamps
+    return EPOCH + datetime.timedelta(seconds=int(seconds), microseconds=int(nanos) // NANOSECONDS_PER_MICROSECOND)
 ##### END - BQ DTS API helpers #####
 
 ##### BEGIN - BQ DTS and BigQuery Helpers #####
 BQ_JOB_ID_MATCHER = re.compile('[^a-zA-Z0-9_-]')
+BQ_JOB_ID_MAX_TABLE_CHARS = 900
+BQ_JOB_ID_MAX_RETRIES = 5
 
 
 def RPCFieldSchema_to_GCloudSchemaField(field_schema):
@@ -229,6 +726,7 @@ def RPCFieldSchema_to_GCloudSchemaField(field_schema):
     :param field_schema:
     :return:
     """
+    from google.cloud import bigquery
     bq_schema_field = dict()
     bq_schema_field['name'] = field_schema['field_name']
     bq_schema_field['field_type'] = field_schema['type']
@@ -254,7 +752,7 @@ def RPCRecordSchema_to_GCloudSchema(record_schema):
     return [RPCFieldSchema_to_GCloudSchemaField(current_field) for current_field in record_schema['fields']]
 
 
-def DTSTableDefinition_to_BQLoadJobConfig(dts_tabledef):
+def DTSTableDefinition_to_BQLoadJobConfig(dts_tabledef, schema=None):
     """
     https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rpc/google.cloud.bigquery.datatransfer.v1#tabledefinition
 
@@ -263,12 +761,14 @@ def DTSTableDefinition_to_BQLoadJobConfig(dts_tabledef):
     https://googlecloudplatform.github.io/google-cloud-python/latest/bigquery/reference.html#google.cloud.bigquery.job.LoadJob
 
     :param dts_tabledef:
+    :param schema: Pre-built list of bigquery.SchemaField, otherwise derived from dts_tabledef
     :return:
     """
+    from google.cloud import bigquery
     from bq_dts import rest_client
-    job_config = LoadJobConfig()
+    job_config = bigquery.LoadJobConfig()
 
-    dts_schema = RPCRecordSchema_to_GCloudSchema(dts_tabledef['schema'])
+    dts_schema = schema if schema is not None else RPCRecordSchema_to_GCloudSchema(dts_tabledef['schema'])
     job_config.schema = dts_schema
 
     # BQ DTS does not provide controls for the following dispositions
@@ -302,47 +802,199 @@ def DTSTableDefinition_to_BQLoadJobConfig(dts_tabledef):
     return job_config
 
 
-def load_bigquery_table_via_bq_apis(bq_client: bigquery.Client, dataset_id, table_name, imported_data_info, src_uris):
+def bigquery_load_job_id(run_name, table_name, src_uris, checksums=None):
+    """
+    Deterministic load job ID from the TransferRun, target table and staged content
+
+    A redelivered run staging the same data derives the same ID, see load_bigquery_table_via_bq_apis
+    """
+    checksums = checksums or dict()
+
+    content_hash = hashlib.sha256()
+    content_hash.update(run_name.encode('utf-8'))
+    content_hash.update(table_name.encode('utf-8'))
+    for current_uri in sorted(src_uris):
+        content_hash.update(f'\n{current_uri}:{checksums.get(current_uri) or ""}'.encode('utf-8'))
+
+    # NOTE - Job IDs allow [a-zA-Z0-9_-] up to 1024 chars
+    clean_table_name = BQ_JOB_ID_MATCHER.sub('___', table_name)[:BQ_JOB_ID_MAX_TABLE_CHARS]
+    return f'{clean_table_name}_{content_hash.hexdigest()[:32]}'
+
+
+@tracing.traced('bigquery.load_table')
+def load_bigquery_table_via_bq_apis(bq_client: 'bigquery.Client', dataset_id, table_name, imported_data_info, src_uris,
+                                    schema=None, job_config=None, run_name=None, checksums=None):
     """
     Load tables using BigQuery Load jobs, using the same configuration as BQ DTS ImportedDataInfo
+
+    schema and job_config may be passed pre-built, see connector_config.CompiledImportedDataInfo
+
+    With run_name, the job ID is derived from run_name, table_name, src_uris and their checksums.  If that job already
+    exists, it is returned instead of starting a new load - unless it failed, then a "_retryN" suffixed ID is used.
     :return:
     """
     # https://googlecloudplatform.github.io/google-cloud-python/latest/_modules/google/cloud/bigquery/client.html#Client.load_table_from_uri
+    from google.cloud import exceptions
+
     # Step 1 - Translate required fields for BigQuery Python SDK
     tgt_tabledef = imported_data_info['table_defs'][0]
 
     # Step 2 - Create target table if it doesn't exist
+    table_ref = _create_bigquery_table_if_missing(bq_client, dataset_id, table_name, imported_data_info, schema=schema)
+
+    # Step 3a - Create BigQuery Load Job ID
+    if run_name:
+        clean_job_id = bigquery_load_job_id(run_name, table_name, src_uris, checksums=checksums)
+    else:
+        current_datetime = datetime.datetime.utcnow().isoformat()
+        raw_job_id = f'{table_name}_{current_datetime}'
+        clean_job_id = BQ_JOB_ID_MATCHER.sub('___', raw_job_id)
+
+    # Step 3b - Create BigQuery Job Config
+    job_config = job_config or DTSTableDefinition_to_BQLoadJobConfig(tgt_tabledef, schema=schema)
+
+    # Step 4 - Execute BigQuery Load Job using Python SDK
+    for retry_idx in range(BQ_JOB_ID_MAX_RETRIES + 1):
+        current_job_id = f'{clean_job_id}_retry{retry_idx}' if retry_idx else clean_job_id
+        try:
+            quota.acquire(quota.API_BIGQUERY, 'load_table_from_uri')
+            return bq_client.load_table_from_uri(source_uris=src_uris, destination=table_ref,
+                                                 job_id=current_job_id, job_config=job_config)
+        except exceptions.Conflict:
+            # Step 4a - Attach to the existing job, unless it failed
+            quota.acquire(quota.API_BIGQUERY, 'get_job')
+            existing_job = bq_client.get_job(current_job_id)
+            if not existing_job.error_result:
+                return existing_job
+
+    raise RuntimeError(f'BigQuery load {clean_job_id} failed {BQ_JOB_ID_MAX_RETRIES + 1} times')
+
+
+def _create_bigquery_table_if_missing(bq_client, dataset_id, table_name, imported_data_info, schema=None):
+    from google.cloud import bigquery
+    from google.cloud import exceptions
+
+    tgt_tabledef = imported_data_info['table_defs'][0]
+
     dataset_ref = bq_client.dataset(dataset_id)
     table_ref = dataset_ref.table(table_name)
     try:
+        quota.acquire(quota.API_BIGQUERY, 'get_table')
         bq_client.get_table(table_ref)
     except exceptions.NotFound:
-        # Step 2a - Attach schema
-        tgt_schema = RPCRecordSchema_to_GCloudSchema(tgt_tabledef['schema'])
+        # Step 1 - Attach schema
+        tgt_schema = schema if schema is not None else RPCRecordSchema_to_GCloudSchema(tgt_tabledef['schema'])
         tgt_table = bigquery.Table(table_ref, schema=tgt_schema)
 
-        # Step 2b - Attach description
+        # Step 2 - Attach description
         tgt_table.description = imported_data_info['destination_table_description']
 
-        # Step 2c - Conditionally set partitioning type
+        # Step 3 - Conditionally set partitioning type
         if '$' in table_name:
             tgt_table.partitioning_type = 'DAY'
             tgt_table._properties['tableReference']['tableId'], _, _ = table_name.partition('$')
 
-        # Step 2d - Create BigQuery table
+        # Step 4 - Create BigQuery table
+        quota.acquire(quota.API_BIGQUERY, 'create_table')
         bq_client.create_table(tgt_table)
 
-    # Step 3a - Create BigQuery Load Job ID
-    current_datetime = datetime.datetime.utcnow().isoformat()
-    raw_job_id = f'{table_name}_{current_datetime}'
-    clean_job_id = BQ_JOB_ID_MATCHER.sub('___', raw_job_id)
+    return table_ref
 
-    # Step 3b - Create BigQuery Job Config
-    job_config = DTSTableDefinition_to_BQLoadJobConfig(tgt_tabledef)
 
-    # Step 4 - Execute BigQuery Load Job using Python SDK
-    load_job = bq_client.load_table_from_uri(source_uris=src_uris, destination=table_ref,
-                                             job_id=clean_job_id, job_config=job_config)
+@tracing.traced('bigquery.load_table_from_files')
+def load_bigquery_table_from_local_files(bq_client: 'bigquery.Client', dataset_id, table_name, imported_data_info,
+                                         local_uris, schema=None, max_workers=1, timeout_secs=None):
+    """
+    Development only - Load local files straight into BigQuery, skipping the GCS staging bucket
+
+    The first file truncates the table and must finish before the remaining files are appended concurrently.
+    :return: List of load jobs, the appends may still be running
+    """
+    # https://googlecloudplatform.github.io/google-cloud-python/latest/_modules/google/cloud/bigquery/client.html#Client.load_table_from_file
+    from google.cloud import bigquery
+
+    # Step 1 - Create target table if it doesn't exist
+    tgt_tabledef = imported_data_info['table_defs'][0]
+    table_ref = _create_bigquery_table_if_missing(bq_client, dataset_id, table_name, imported_data_info, schema=schema)
+
+    def load_file(local_uri, job_config):
+        quota.acquire(quota.API_BIGQUERY, 'load_table_from_file')
+        with open(local_uri, 'rb') as local_fp:
+            return bq_client.load_table_from_file(local_fp, table_ref, job_config=job_config)
+
+    if not local_uris:
+        return list()
+
+    # Step 2 - Load the first file with WRITE_TRUNCATE, and wait for it
+    truncate_job = load_file(local_uris[0], DTSTableDefinition_to_BQLoadJobConfig(tgt_tabledef, schema=schema))
+    wait_for_bigquery_jobs([truncate_job], timeout_secs)
+    if truncate_job.error_result or len(local_uris) == 1:
+        return [truncate_job]
+
+    # Step 3 - Append the remaining files concurrently
+    append_job_config = DTSTableDefinition_to_BQLoadJobConfig(tgt_tabledef, schema=schema)
+    append_job_config.write_disposition = bigquery.WriteDisposition.WRITE_APPEND
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(local_uris) - 1))) as executor:
+        append_futures = [executor.submit(tracing.wrap(load_file), local_uri, append_job_config)
+                          for local_uri in local_uris[1:]]
+
+    return [truncate_job] + [append_future.result() for append_future in append_futures]
+
+
+DEFAULT_BQ_JOB_POLL_SECS = 1.0
+MAX_BQ_JOB_POLL_SECS = 10.0
+
+
+def wait_for_bigquery_jobs(bq_jobs, timeout_secs=None, poll_secs=DEFAULT_BQ_JOB_POLL_SECS):
+    """
+    Poll every job from one thread until all are DONE, backing off between rounds
+
+    Raises TimeoutError naming the jobs still pending after timeout_secs, None waits forever
+    """
+    time_deadline = time.time() + timeout_secs if timeout_secs else float('inf')
+    pending_jobs = list(bq_jobs)
+
+    while True:
+        # Step 1 - Refresh every pending job
+        still_pending = list()
+        for current_job in pending_jobs:
+            quota.acquire(quota.API_BIGQUERY, 'get_job')
+            current_job.reload()
+            if current_job.state != 'DONE':
+                still_pending.append(current_job)
+
+        pending_jobs = still_pending
+        if not pending_jobs:
+            return
 
-    return load_job
+        # Step 2 - Give up at the deadline, otherwise back off
+        remaining_secs = time_deadline - time.time()
+        if remaining_secs <= 0:
+            pending_job_ids = [current_job.job_id for current_job in pending_jobs]
+            raise TimeoutError(f'BigQuery jobs still running after {timeout_secs}s - {pending_job_ids}')
+
+        time.sleep(min(poll_secs, remaining_secs))
+        poll_secs = min(poll_secs * 2.0, MAX_BQ_JOB_POLL_SECS)
+
+
+def load_jobs_to_result_dict(load_jobs):
+    """Per-table load outcome across that table's load jobs - rows, bytes, duration and errors"""
+    time_started = [load_job.started for load_job in load_jobs if load_job.started]
+    time_ended = [load_job.ended for load_job in load_jobs if load_job.ended]
+
+    duration_secs = None
+    if time_started and time_ended:
+        duration_secs = round((max(time_ended) - min(time_started)).total_seconds(), 3)
+
+    failed_jobs = [load_job for load_job in load_jobs if load_job.error_result]
+    return dict(
+        job_ids=[load_job.job_id for load_job in load_jobs],
+        state='DONE' if all(load_job.state == 'DONE' for load_job in load_jobs) else 'PENDING',
+        output_rows=sum(load_job.output_rows or 0 for load_job in load_jobs),
+        output_bytes=sum(load_job.output_bytes or 0 for load_job in load_jobs),
+        duration_secs=duration_secs,
+        error_result=failed_jobs[0].error_result if failed_jobs else None,
+        errors=[current_error for load_job in failed_jobs for current_error in (load_job.errors or list())]
+    )
 ##### END - BQ DTS and BigQuery Helpers #####
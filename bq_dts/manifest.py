@@ -0,0 +1,188 @@
+# Copyright 2018 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-TransferRun checkpoint manifest, so a redelivered run only redoes unfinished work
+
+{local_prefix}/_manifest.json
+{
+  "run_name": "projects/.../runs/...",
+  "tables": {
+    "mytable_1234$20180101": {"status": "UPLOADED", "local_uris": [...], "gcs_uris": [...], "checksums": {...}}
+  },
+  "started_chunks": ["<sha256 of a startBigQueryJobs request>", ...]
+}
+
+Tables go STAGED (local files written) => UPLOADED (GCS objects written).  Every update is written atomically
+and, with a GCS mirror, uploaded too - so a run redelivered to another host can skip already uploaded tables.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from bq_dts import helpers
+from bq_dts import quota
+
+MANIFEST_FILENAME = '_manifest.json'
+
+
+class TableStatus(object):
+    STAGED = 'STAGED'
+    UPLOADED = 'UPLOADED'
+
+
+def chunk_key(chunk_idis):
+    """Stable key for one startBigQueryJobs request body"""
+    return hashlib.sha256(json.dumps(chunk_idis, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class RunManifest(object):
+    """
+    Thread-safe, tables are staged and startBigQueryJobs requests sent from worker threads
+    """
+    def __init__(self, run_name, local_uri, gcs_client=None, gcs_uri=None):
+        self.run_name = run_name
+        self.local_uri = local_uri
+        self.gcs_client = gcs_client
+        self.gcs_uri = gcs_uri
+
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._state = dict(run_name=run_name, tables=dict(), started_chunks=list())
+
+    ##### BEGIN - Persistence #####
+    def load(self):
+        """
+        Load from the local file, falling back to the GCS mirror
+
+        :return: True if a manifest for this run was found
+        """
+        raw_state = self._read_local() or self._read_gcs()
+        if not raw_state or raw_state.get('run_name') != self.run_name:
+            return False
+
+        with self._lock:
+            self._state['tables'] = raw_state.get('tables') or dict()
+            self._state['started_chunks'] = raw_state.get('started_chunks') or list()
+        return True
+
+    def _read_local(self):
+        try:
+            with open(self.local_uri, 'r') as manifest_fp:
+                return json.load(manifest_fp)
+        except (OSError, ValueError):
+            return None
+
+    def _read_gcs(self):
+        if not self.gcs_uri:
+            return None
+
+        gcs_bucket, gcs_blob = helpers.parse_gcs_uri(self.gcs_uri)
+        quota.acquire(quota.API_GCS, 'get_blob')
+        blob_obj = self.gcs_client.bucket(gcs_bucket).get_blob(gcs_blob)
+        if blob_obj is None:
+            return None
+
+        quota.acquire(quota.API_GCS, 'download')
+        return json.loads(blob_obj.download_as_string().decode('utf-8'))
+
+    def save(self):
+        # NOTE - Snapshot and write under one lock, so the last write always carries the newest state
+        with self._save_lock:
+            self._save()
+
+    def _save(self):
+        with self._lock:
+            manifest_str = json.dumps(self._state, sort_keys=True, indent=2)
+
+        # Step 1 - Write atomically so a crash mid-write never leaves a truncated manifest
+        manifest_dir = os.path.dirname(self.local_uri)
+        os.makedirs(manifest_dir, exist_ok=True)
+        tmp_fd, tmp_uri = tempfile.mkstemp(dir=manifest_dir, suffix='.tmp')
+        with os.fdopen(tmp_fd, 'w') as tmp_fp:
+            tmp_fp.write(manifest_str)
+        os.replace(tmp_uri, self.local_uri)
+
+        # Step 2 - Optionally mirror to GCS
+        if self.gcs_uri:
+            gcs_bucket, gcs_blob = helpers.parse_gcs_uri(self.gcs_uri)
+            quota.acquire(quota.API_GCS, 'upload')
+            self.gcs_client.bucket(gcs_bucket).blob(gcs_blob).upload_from_string(
+                manifest_str, content_type='application/json')
+    ##### END - Persistence #####
+
+    ##### BEGIN - Tables #####
+    def get_table(self, table_name):
+        with self._lock:
+            return self._state['tables'].get(table_name)
+
+    def staged_uris(self, table_name):
+        """
+        :return: Local URIs of a table staged by an earlier delivery, None if it must be restaged
+        """
+        table_entry = self.get_table(table_name)
+        if not table_entry:
+            return None
+
+        # NOTE - Uploaded tables never need their local files again, staged-only tables do
+        if table_entry['status'] == TableStatus.UPLOADED:
+            return table_entry['local_uris']
+
+        if all(os.path.exists(current_uri) for current_uri in table_entry['local_uris']):
+            return table_entry['local_uris']
+
+        return None
+
+    def uploaded_table(self, table_name):
+        """
+        :return: (gcs_uris, checksums) of a table uploaded by an earlier delivery, None if it must be re-uploaded
+        """
+        table_entry = self.get_table(table_name)
+        if not table_entry or table_entry['status'] != TableStatus.UPLOADED:
+            return None
+        return table_entry['gcs_uris'], table_entry['checksums']
+
+    def mark_staged(self, table_name, local_uris):
+        with self._lock:
+            self._state['tables'][table_name] = dict(
+                status=TableStatus.STAGED,
+                local_uris=[str(current_uri) for current_uri in local_uris],
+                gcs_uris=list(),
+                checksums=dict())
+        self.save()
+
+    def mark_uploaded(self, table_name, gcs_uris, checksums):
+        with self._lock:
+            table_entry = self._state['tables'].setdefault(table_name, dict(local_uris=list()))
+            table_entry.update(status=TableStatus.UPLOADED, gcs_uris=[str(current_uri) for current_uri in gcs_uris],
+                               checksums=dict(checksums or dict()))
+        self.save()
+    ##### END - Tables #####
+
+    ##### BEGIN - startBigQueryJobs requests #####
+    def is_chunk_started(self, chunk_idis):
+        current_key = chunk_key(chunk_idis)
+        with self._lock:
+            return current_key in self._state['started_chunks']
+
+    def mark_chunk_started(self, chunk_idis):
+        current_key = chunk_key(chunk_idis)
+        with self._lock:
+            if current_key not in self._state['started_chunks']:
+                self._state['started_chunks'].append(current_key)
+        self.save()
+    ##### END - startBigQueryJobs requests #####
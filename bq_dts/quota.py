@@ -0,0 +1,188 @@
+# Copyright 2018 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Client-side token-bucket rate governor, keeping API calls just under quota instead of backing off on 429s
+
+Rates are keyed by "API" or "API.METHOD" in queries per second, e.g.
+
+dts=20                 # All BQ DTS API calls
+dts.runs.logMessages=5 # Only runs.logMessages, ALSO counted against "dts"
+gcs.upload=50
+
+quota.acquire() is a no-op until a governor is installed via set_governor().  With a state_dir, buckets are
+shared by every process on the host through fcntl-locked files.
+"""
+
+import argparse
+import fcntl
+import os
+import struct
+import threading
+import time
+
+API_DTS = 'dts'
+API_GCS = 'gcs'
+API_BIGQUERY = 'bigquery'
+
+DEFAULT_BURST_SECS = 1.0
+
+_BUCKET_STATE_FORMAT = struct.Struct('<dd')
+
+_governor = None
+
+
+def set_governor(governor):
+    global _governor
+    _governor = governor
+
+
+def get_governor():
+    return _governor
+
+
+def acquire(api, method, tokens=1.0):
+    """Block until api/method has quota for tokens calls - No-op unless a QuotaGovernor is installed"""
+    if _governor is None:
+        return 0.0
+
+    return _governor.acquire(api, method, tokens=tokens)
+
+
+def parse_rate_limit(rate_limit_str):
+    """
+    'dts.runs.patch=5' => ('dts.runs.patch', 5.0)
+    """
+    # NOTE - Used as an argparse type=, ArgumentTypeError is reported as a usage error
+    quota_key, _, qps_str = rate_limit_str.partition('=')
+    try:
+        qps = float(qps_str)
+    except ValueError:
+        qps = 0.0
+
+    if not quota_key.strip() or not qps > 0.0:
+        raise argparse.ArgumentTypeError(f'Invalid rate limit "{rate_limit_str}", expected API[.METHOD]=QPS')
+    return quota_key.strip(), qps
+
+
+class TokenBucket(object):
+    """
+    Thread-safe token bucket refilling at rate tokens/sec, holding at most burst tokens
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate * DEFAULT_BURST_SECS)
+
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._last_refill = time.time()
+
+    def _try_take(self, tokens):
+        """
+        :return: 0.0 if tokens were taken, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            self._tokens, self._last_refill = _refill(self._tokens, self._last_refill, self.rate, self.burst)
+            return self._take(tokens)
+
+    def _take(self, tokens):
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return 0.0
+        return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1.0):
+        """
+        :return: Seconds spent waiting
+        """
+        waited_secs = 0.0
+        while True:
+            wait_secs = self._try_take(tokens)
+            if not wait_secs:
+                return waited_secs
+
+            time.sleep(wait_secs)
+            waited_secs += wait_secs
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in state_uri, so every process on the host shares one bucket
+    """
+    def __init__(self, rate, state_uri, burst=None):
+        super().__init__(rate, burst=burst)
+        self.state_uri = state_uri
+
+    def _try_take(self, tokens):
+        # NOTE - The thread lock avoids contending on flock() between threads of the same process
+        with self._lock, open(self.state_uri, 'a+b') as state_fp:
+            fcntl.flock(state_fp, fcntl.LOCK_EX)
+            try:
+                # Step 1 - Load shared state, a new file starts full
+                state_fp.seek(0)
+                raw_state = state_fp.read(_BUCKET_STATE_FORMAT.size)
+                if len(raw_state) == _BUCKET_STATE_FORMAT.size:
+                    self._tokens, self._last_refill = _BUCKET_STATE_FORMAT.unpack(raw_state)
+                else:
+                    self._tokens, self._last_refill = self.burst, time.time()
+
+                # Step 2 - Refill and take
+                self._tokens, self._last_refill = _refill(self._tokens, self._last_refill, self.rate, self.burst)
+                wait_secs = self._take(tokens)
+
+                # Step 3 - Persist shared state
+                state_fp.seek(0)
+                state_fp.truncate()
+                state_fp.write(_BUCKET_STATE_FORMAT.pack(self._tokens, self._last_refill))
+                state_fp.flush()
+                return wait_secs
+            finally:
+                fcntl.flock(state_fp, fcntl.LOCK_UN)
+
+
+def _refill(tokens, last_refill, rate, burst):
+    current_time = time.time()
+    elapsed_secs = max(0.0, current_time - last_refill)
+    return min(burst, tokens + elapsed_secs * rate), current_time
+
+
+class QuotaGovernor(object):
+    """
+    Routes acquire(api, method) through the "api.method" bucket and then the "api" bucket, when configured
+    """
+    def __init__(self, rate_limits, state_dir=None, logger=None):
+        self.logger = logger
+        self._buckets = dict()
+
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+        for quota_key, qps in rate_limits.items():
+            if state_dir:
+                state_uri = os.path.join(state_dir, f'{quota_key}.bucket')
+                self._buckets[quota_key] = FileTokenBucket(qps, state_uri)
+            else:
+                self._buckets[quota_key] = TokenBucket(qps)
+
+    def acquire(self, api, method, tokens=1.0):
+        waited_secs = 0.0
+        for quota_key in (f'{api}.{method}', api):
+            current_bucket = self._buckets.get(quota_key)
+            if current_bucket:
+                waited_secs += current_bucket.acquire(tokens)
+
+        if waited_secs and self.logger:
+            self.logger.debug(f'Quota ; {api}.{method} ; Throttled {waited_secs:.3f}s')
+
+        return waited_secs
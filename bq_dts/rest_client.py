@@ -13,14 +13,31 @@
 # limitations under the License.
 
 # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rpc/
-import copy
+import collections
 import datetime
+import functools
+import contextlib
+import email.utils
+import json
+import logging
 import os
+import queue
+import random
 import re
+import socket
+import string
+import threading
+import time
+from urllib import parse
 
 import google.auth
-from google.cloud import bigquery
-from googleapiclient import discovery
+import google.auth.credentials
+import google_auth_httplib2
+import httplib2
+from googleapiclient import errors
+
+from bq_dts import quota
+from bq_dts import tracing
 
 
 # https://cloud.google.com/bigquery/docs/reference/datatransfer/rest/v1/projects.locations/list
@@ -29,6 +46,41 @@ BQ_DTS_LOCATIONS = {'us', 'europe', 'asia-northeast1'}
 BQ_DTS_OAUTH_SCOPES = ["https://www.googleapis.com/auth/pubsub", "https://www.googleapis.com/auth/bigquery"]
 BQ_DTS_API_ENDPOINT = 'bigquerydatatransfer'
 BQ_DTS_API_VERSION = 'v1'
+BQ_DTS_API_ROOT_URL = 'https://bigquerydatatransfer.googleapis.com/'
+# Scopes the partner API accepts, as listed by the discovery doc's auth.oauth2.scopes
+BQ_DTS_API_OAUTH_SCOPES = ['https://www.googleapis.com/auth/bigquery', 'https://www.googleapis.com/auth/cloud-platform']
+
+DEFAULT_HTTP_POOL_SIZE = 10
+DEFAULT_HTTP_TIMEOUT_SECS = 60.0
+
+# Small, frequent control calls worth coalescing across runs, see DTSRequestBatcher
+BATCHABLE_API_METHODS = {('runs', 'logMessages'), ('runs', 'patch')}
+DEFAULT_BATCH_MAX_SIZE = 100
+
+# Retries, see RetryPolicy
+# NOTE - Non-idempotent methods are only retried on statuses where the request was never processed
+NON_IDEMPOTENT_API_METHODS = {
+    ('runs', 'startBigQueryJobs'), ('runs', 'logMessages'),
+    ('dataSourceDefinitions', 'create'), ('locations', 'enrollDataSources')
+}
+RETRYABLE_STATUSES_IDEMPOTENT = {429, 500, 502, 503, 504}
+RETRYABLE_STATUSES_NON_IDEMPOTENT = {429, 503}
+RETRYABLE_TRANSPORT_ERRORS = (socket.timeout, ConnectionError, httplib2.ServerNotFoundError)
+
+DEFAULT_RETRY_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_INITIAL_BACKOFF_SECS = 1.0
+DEFAULT_RETRY_MAX_BACKOFF_SECS = 32.0
+DEFAULT_RETRY_MAX_RETRY_AFTER_SECS = 120.0
+DEFAULT_RETRY_BUDGET_TOKENS = 10.0
+DEFAULT_RETRY_BUDGET_REFUND = 0.1
+
+# Per-user credentials, see CredentialCache
+# NOTE - The Credentials resource carries no expiry, so caching is opt-in - a TTL under the issued tokens' lifetime
+DEFAULT_CREDENTIALS_TTL_SECS = 0
+DEFAULT_CREDENTIALS_REFRESH_AHEAD_SECS = 5 * 60
+DEFAULT_CREDENTIALS_CACHE_SIZE = 1024
+
+logger = logging.getLogger(__name__)
 
 TRANSFER_RUN_NAME_PARSER = re.compile('projects/(.*?)/locations/(.*?)/transferConfigs/(.*?)/runs/(.*?)')
 TRANSFER_RUN_NAME_FORMATTER = 'projects/{project_id}/locations/{location_id}/transferConfigs/{config_id}/runs/{run_id}'
@@ -40,6 +92,395 @@ BQ_DTS_PARTNER_API_DISCOVERY_DOC_PATH = os.path.join(
     os.path.dirname(__file__), 'api_discovery.json'
 )
 
+_discovery_build_lock = threading.Lock()
+_discovery_pools_lock = threading.Lock()
+_discovery_pools_cache = dict()
+
+
+@functools.lru_cache(maxsize=1)
+def load_discovery_document():
+    # Parsed once per process, shared by every PartnerDTSClient
+    with open(BQ_DTS_PARTNER_API_DISCOVERY_DOC_PATH) as fp:
+        return json.load(fp)
+
+
+def discovery_scopes():
+    return list(load_discovery_document().get('auth', {}).get('oauth2', {}).get('scopes', {}).keys())
+
+
+class DiscoveryResources(object):
+    """
+    Discovery-built client plus the resource chains used by PartnerDTSClient
+
+    Each instance owns a keep-alive httplib2.Http, which is NOT thread-safe, see DiscoveryResourcesPool
+    """
+    def __init__(self, credentials, timeout=DEFAULT_HTTP_TIMEOUT_SECS):
+        # NOTE - Deferred import, googleapiclient.discovery is slow to import and unused by LeanPartnerDTSClient
+        from googleapiclient import discovery
+
+        # NOTE - Scope the credentials as build_from_document(credentials=...) would, from the discovery doc
+        scoped_credentials = google.auth.credentials.with_scopes_if_required(credentials, discovery_scopes())
+        authorized_http = google_auth_httplib2.AuthorizedHttp(scoped_credentials, http=httplib2.Http(timeout=timeout))
+
+        # NOTE - build_from_document fills in the shared discovery document's method parameters, serialize builds
+        with _discovery_build_lock:
+            self.rest_client = discovery.build_from_document(service=load_discovery_document(), http=authorized_http)
+
+        self.locations = self.rest_client.projects().locations()
+        self.runs = self.locations.transferConfigs().runs()
+        self.data_source_definitions = self.locations.dataSourceDefinitions()
+        self.credentials = self.locations.dataSources().credentials()
+
+        self.resources_by_name = {
+            'locations': self.locations,
+            'runs': self.runs,
+            'dataSourceDefinitions': self.data_source_definitions,
+            'credentials': self.credentials
+        }
+
+
+class DiscoveryResourcesPool(object):
+    """
+    Bounded pool of DiscoveryResources, so concurrent runs and log-flush timers never share an httplib2.Http
+
+    Connections stay open between calls, avoiding TLS handshakes on every logMessages / patch call
+
+    with pool.acquire() as resources:
+        resources.runs.patch(...).execute()
+    """
+    def __init__(self, credentials, pool_size=DEFAULT_HTTP_POOL_SIZE, timeout=DEFAULT_HTTP_TIMEOUT_SECS):
+        assert pool_size > 0
+
+        self.credentials = credentials
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    @contextlib.contextmanager
+    def acquire(self):
+        resources = self._checkout()
+        try:
+            yield resources
+        finally:
+            self._idle.put(resources)
+
+    def _checkout(self):
+        # Step 1 - Prefer the most recently used connection, it is the most likely to still be alive
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Step 2 - Grow the pool up to pool_size
+        with self._lock:
+            should_create = self._created < self.pool_size
+            if should_create:
+                self._created += 1
+
+        if should_create:
+            try:
+                return DiscoveryResources(self.credentials, timeout=self.timeout)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        # Step 3 - Otherwise, wait for a connection to be returned
+        return self._idle.get()
+
+
+class _PendingCall(object):
+    def __init__(self, resource_name, method_name, kwargs):
+        self.resource_name = resource_name
+        self.method_name = method_name
+        self.kwargs = kwargs
+
+        self.result = None
+        self.error = None
+        self.is_done = threading.Event()
+
+    def on_response(self, request_id, response, exception):
+        # Signature matches googleapiclient.http.BatchHttpRequest callbacks
+        self.result = response
+        self.error = exception
+        self.is_done.set()
+
+
+class DTSRequestBatcher(object):
+    """
+    Coalesces calls from many threads into one batch request
+
+    The first call in a batch starts a linger_secs timer, the batch is sent when the timer fires or once
+    max_batch_size calls are pending.  Each caller blocks until its own response (or error) is fanned back out.
+    """
+    def __init__(self, execute_batch_fxn, linger_secs, max_batch_size=DEFAULT_BATCH_MAX_SIZE):
+        self.linger_secs = linger_secs
+        self.max_batch_size = max_batch_size
+
+        self._execute_batch_fxn = execute_batch_fxn
+        self._lock = threading.Lock()
+        self._pending_calls = list()
+        self._linger_timer = None
+
+    def call(self, resource_name, method_name, kwargs):
+        pending_call = _PendingCall(resource_name, method_name, kwargs)
+
+        # Step 1 - Queue the call, sending immediately if the batch is full
+        full_batch = None
+        with self._lock:
+            self._pending_calls.append(pending_call)
+            if len(self._pending_calls) >= self.max_batch_size:
+                full_batch = self._take_batch()
+            elif not self._linger_timer:
+                self._linger_timer = threading.Timer(self.linger_secs, self._flush)
+                self._linger_timer.daemon = True
+                self._linger_timer.start()
+
+        if full_batch:
+            self._execute_batch(full_batch)
+
+        # Step 2 - Wait for our response to be fanned back out
+        pending_call.is_done.wait()
+        if pending_call.error:
+            raise pending_call.error
+        return pending_call.result
+
+    def _take_batch(self):
+        # NOTE - Caller must hold self._lock
+        if self._linger_timer:
+            self._linger_timer.cancel()
+            self._linger_timer = None
+
+        batch, self._pending_calls = self._pending_calls, list()
+        return batch
+
+    def _flush(self):
+        with self._lock:
+            batch = self._take_batch()
+
+        if batch:
+            self._execute_batch(batch)
+
+    def _execute_batch(self, batch):
+        try:
+            self._execute_batch_fxn(batch)
+        except Exception as batch_error:
+            for pending_call in batch:
+                if not pending_call.is_done.is_set():
+                    pending_call.on_response(None, None, batch_error)
+        finally:
+            # Never leave a caller hanging if a response went missing
+            for pending_call in batch:
+                if not pending_call.is_done.is_set():
+                    pending_call.on_response(None, None, RuntimeError('No response in batch'))
+
+
+class RetryBudget(object):
+    """
+    Token bucket shared by every call in a process, so a DTS outage can't turn into a retry storm
+
+    Each retry spends 1 token, each successful call refunds refund_ratio tokens up to max_tokens
+    """
+    def __init__(self, max_tokens=DEFAULT_RETRY_BUDGET_TOKENS, refund_ratio=DEFAULT_RETRY_BUDGET_REFUND):
+        self.max_tokens = max_tokens
+        self.refund_ratio = refund_ratio
+
+        self._lock = threading.Lock()
+        self._tokens = max_tokens
+
+    def try_spend(self):
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+
+            self._tokens -= 1.0
+            return True
+
+    def refund(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.refund_ratio)
+
+_default_retry_budget = RetryBudget()
+
+
+class RetryPolicy(object):
+    """
+    Idempotency-aware retries with exponential backoff, full jitter, Retry-After and a shared RetryBudget
+
+    max_attempts=1 disables retries
+    """
+    def __init__(self, max_attempts=DEFAULT_RETRY_MAX_ATTEMPTS, initial_backoff_secs=DEFAULT_RETRY_INITIAL_BACKOFF_SECS,
+                 max_backoff_secs=DEFAULT_RETRY_MAX_BACKOFF_SECS, budget=None):
+        assert max_attempts >= 1
+
+        self.max_attempts = max_attempts
+        self.initial_backoff_secs = initial_backoff_secs
+        self.max_backoff_secs = max_backoff_secs
+        self.budget = budget or _default_retry_budget
+
+    def call(self, api_fxn, resource_name, method_name):
+        attempt = 1
+        while True:
+            try:
+                result = api_fxn()
+            except Exception as api_error:
+                if attempt >= self.max_attempts or not self.is_retryable(resource_name, method_name, api_error):
+                    raise
+
+                if not self.budget.try_spend():
+                    logger.warning(f'BQ DTS ; {resource_name}.{method_name} ; Retry budget exhausted, not retrying')
+                    raise
+
+                backoff_secs = self.backoff_secs(attempt, api_error)
+                logger.warning(f'BQ DTS ; {resource_name}.{method_name} ; Attempt {attempt} failed with '
+                               f'{api_error!r}, retrying in {backoff_secs:.2f}s')
+                time.sleep(backoff_secs)
+                attempt += 1
+            else:
+                self.budget.refund()
+                return result
+
+    def is_retryable(self, resource_name, method_name, api_error):
+        is_idempotent = (resource_name, method_name) not in NON_IDEMPOTENT_API_METHODS
+
+        if isinstance(api_error, errors.HttpError):
+            if is_idempotent:
+                return api_error.resp.status in RETRYABLE_STATUSES_IDEMPOTENT
+            return api_error.resp.status in RETRYABLE_STATUSES_NON_IDEMPOTENT
+
+        # NOTE - A transport error may happen after the server processed the request
+        return is_idempotent and isinstance(api_error, RETRYABLE_TRANSPORT_ERRORS)
+
+    def backoff_secs(self, attempt, api_error):
+        # Step 1 - Honor Retry-After when the server sends one
+        retry_after_secs = _parse_retry_after(api_error)
+        if retry_after_secs is not None:
+            return min(retry_after_secs, DEFAULT_RETRY_MAX_RETRY_AFTER_SECS)
+
+        # Step 2 - Otherwise, exponential backoff with full jitter
+        max_backoff_secs = min(self.max_backoff_secs, self.initial_backoff_secs * (2 ** (attempt - 1)))
+        return random.uniform(0.0, max_backoff_secs)
+
+
+def _parse_retry_after(api_error):
+    # https://tools.ietf.org/html/rfc7231#section-7.1.3 - Either delay-seconds or an HTTP-date
+    if not isinstance(api_error, errors.HttpError):
+        return None
+
+    retry_after = api_error.resp.get('retry-after')
+    if not retry_after:
+        return None
+
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+
+    retry_after_time = email.utils.parsedate_tz(retry_after)
+    if retry_after_time is None:
+        return None
+
+    return max(0.0, email.utils.mktime_tz(retry_after_time) - time.time())
+
+
+class _CredentialFetch(object):
+    """Single-flight handle, every caller waiting on the same key shares one fetch"""
+    __slots__ = ['done', 'value', 'error']
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class CredentialCache(object):
+    """
+    Thread-safe, bounded LRU of fetch_fxn(*key) results that expire after ttl_secs
+
+    * Concurrent misses for one key share a single fetch_fxn call
+    * Hits within refresh_ahead_secs of expiry trigger one background refresh and return the cached value
+    """
+    def __init__(self, fetch_fxn, ttl_secs,
+                 refresh_ahead_secs=DEFAULT_CREDENTIALS_REFRESH_AHEAD_SECS, max_size=DEFAULT_CREDENTIALS_CACHE_SIZE):
+        assert ttl_secs > 0 and max_size > 0
+
+        self.fetch_fxn = fetch_fxn
+        self.ttl_secs = ttl_secs
+        # NOTE - A fraction of the TTL, otherwise short TTLs would refresh on every hit
+        self.refresh_ahead_secs = min(refresh_ahead_secs, ttl_secs / 4)
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()  # key => (value, expires_at)
+        self._fetches = dict()  # key => _CredentialFetch
+
+    def get(self, key):
+        current_time = time.time()
+        with self._lock:
+            # Step 1 - Serve fresh entries, refreshing in the background when close to expiry
+            cached_entry = self._entries.get(key)
+            if cached_entry and current_time < cached_entry[1]:
+                self._entries.move_to_end(key)
+                if current_time >= cached_entry[1] - self.refresh_ahead_secs and key not in self._fetches:
+                    current_fetch = self._fetches[key] = _CredentialFetch()
+                    refresh_thread = threading.Thread(target=self._fetch, args=(key, current_fetch),
+                                                      name='credential-refresh', daemon=True)
+                    refresh_thread.start()
+                return cached_entry[0]
+
+            # Step 2 - On a miss, join the in-flight fetch OR lead a new one
+            current_fetch = self._fetches.get(key)
+            is_leader = current_fetch is None
+            if is_leader:
+                current_fetch = self._fetches[key] = _CredentialFetch()
+
+        if is_leader:
+            self._fetch(key, current_fetch)
+
+        current_fetch.done.wait()
+        if current_fetch.error:
+            raise current_fetch.error
+        return current_fetch.value
+
+    def _fetch(self, key, current_fetch):
+        try:
+            current_fetch.value = self.fetch_fxn(*key)
+        except Exception as fetch_error:
+            # NOTE - A failed background refresh keeps serving the cached value until it expires
+            logger.warning(f'BQ DTS ; Credentials fetch failed for {key} ; {fetch_error!r}')
+            current_fetch.error = fetch_error
+        else:
+            with self._lock:
+                self._entries[key] = (current_fetch.value, time.time() + self.ttl_secs)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                self._fetches.pop(key, None)
+            current_fetch.done.set()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+def get_discovery_resources_pool(credentials, pool_size=DEFAULT_HTTP_POOL_SIZE, timeout=DEFAULT_HTTP_TIMEOUT_SECS):
+    """Process-level DiscoveryResourcesPool, shared by every PartnerDTSClient with the same credentials"""
+    with _discovery_pools_lock:
+        # NOTE - Keep a reference to credentials so id(credentials) can't be re-used while cached
+        cache_key = (id(credentials), pool_size, timeout)
+        cached_credentials, resources_pool = _discovery_pools_cache.get(cache_key, (None, None))
+        if cached_credentials is not credentials:
+            resources_pool = DiscoveryResourcesPool(credentials, pool_size=pool_size, timeout=timeout)
+            _discovery_pools_cache[cache_key] = (credentials, resources_pool)
+
+        return resources_pool
+
+
 def parse_transfer_run_name(current_str):
     return TRANSFER_RUN_NAME_PARSER.match(current_str).groups()
 
@@ -71,6 +512,7 @@ def dict_to_camel_case(in_dict):
     return out_dict
 
 
+@functools.lru_cache(maxsize=None)
 def to_camel_case(snake_str):
     components = snake_str.split('_')
     # We capitalize the first letter of each component except the first one
@@ -147,15 +589,16 @@ class BQType(Enum):
 
 # BQ DTS  - https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rpc/google.cloud.bigquery.datatransfer.v1#format
 # BQ Load - https://cloud.google.com/bigquery/docs/reference/rest/v2/jobs#configuration.load.sourceFormat
+# NOTE - Literal values of google.cloud.bigquery.SourceFormat / Encoding, importing google.cloud.bigquery is slow
 BQ_DTS_FORMAT_TO_BQ_SOURCE_FORMAT_MAP = {
-    Format.CSV: bigquery.SourceFormat.CSV,
-    Format.JSON: bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
-    Format.AVRO: bigquery.SourceFormat.AVRO,
-    Format.PARQUET: bigquery.SourceFormat.PARQUET,
+    Format.CSV: 'CSV',
+    Format.JSON: 'NEWLINE_DELIMITED_JSON',
+    Format.AVRO: 'AVRO',
+    Format.PARQUET: 'PARQUET',
 }
 
 BQ_DTS_ENCODING_TO_BQ_ENCODING_MAP = {
-    Encoding.UTF8: bigquery.Encoding.UTF_8,
+    Encoding.UTF8: 'UTF-8',
     Encoding.ISO_8859_1: 'ISO-8859-1'
 }
 
@@ -190,6 +633,40 @@ def ImportedDataInfo(sql=None, destination_table_id=None, destination_table_desc
     return idi_rest
 
 
+class ImportedDataInfoBody(dict):
+    """Marker for an ImportedDataInfo already in REST form, passed through as-is by startBigQueryJobs"""
+
+
+class ImportedDataInfoTemplate(object):
+    """
+    ImportedDataInfo built and camel-cased once per connector config
+
+    render() only splices in the per-run table ID and source URIs, sharing the static parts (schemas, options)
+    across runs.  Rendered bodies must be treated as read-only.
+    """
+    def __init__(self, imported_data_info):
+        idi_kwargs = dict(imported_data_info)
+        idi_kwargs.pop('destination_table_id_template', None)
+        idi_kwargs['destination_table_id'] = idi_kwargs.get('destination_table_id') or 'template'
+
+        table_defs = idi_kwargs.get('table_defs') or list()
+        if table_defs:
+            idi_kwargs['table_defs'] = [dict(table_defs[0], source_uris=list())] + table_defs[1:]
+
+        self._idi_rest = ImportedDataInfo(**idi_kwargs)
+
+    def render(self, destination_table_id, source_uris):
+        idi_rest = ImportedDataInfoBody(self._idi_rest)
+        idi_rest['destinationTableId'] = destination_table_id
+
+        table_defs = idi_rest.get('tableDefs')
+        if table_defs:
+            first_tdef = dict(table_defs[0])
+            first_tdef['sourceUris'] = source_uris
+            idi_rest['tableDefs'] = [first_tdef] + table_defs[1:]
+        return idi_rest
+
+
 def TableDefinition(table_id=None, source_uris=None, format=None, max_bad_records=None, encoding=None,
                     csv_options=None, schema=None):
     # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rpc/google.cloud.bigquery.datatransfer.v1#tabledefinition
@@ -291,15 +768,69 @@ def DataSourceParameter(param_id=None, display_name=None, description=None, type
 ##### END - DataSource Helpers #####
 
 class PartnerDTSClient(object):
-    def __init__(self, credentials=None):
+    """
+    BQ DTS Partner API client, safe to share across threads
+
+    batch_linger_secs > 0 coalesces logMessages and patch calls from concurrent runs into batch requests
+    retry_policy retries transient errors, defaults to RetryPolicy()
+    credentials_ttl_secs > 0 caches get_credentials() results per user, see CredentialCache
+    """
+    def __init__(self, credentials=None, pool_size=DEFAULT_HTTP_POOL_SIZE, timeout=DEFAULT_HTTP_TIMEOUT_SECS,
+                 batch_linger_secs=0.0, retry_policy=None, credentials_ttl_secs=DEFAULT_CREDENTIALS_TTL_SECS):
         # project_id = Customer's Project ID
         if credentials is None:
             credentials, project_id = google.auth.default(scopes=BQ_DTS_OAUTH_SCOPES)
 
-        with open(BQ_DTS_PARTNER_API_DISCOVERY_DOC_PATH) as fp:
-            bq_dts_discover_doc = fp.read()
-
-        self._rest_client = discovery.build_from_document(service=bq_dts_discover_doc, credentials=credentials)
+        self._setup_transport(credentials, pool_size=pool_size, timeout=timeout)
+        self._retry_policy = retry_policy or RetryPolicy()
+
+        self._batcher = None
+        if batch_linger_secs:
+            self._batcher = DTSRequestBatcher(self._execute_batch, batch_linger_secs)
+
+        self._credential_cache = None
+        if credentials_ttl_secs:
+            self._credential_cache = CredentialCache(self._fetch_credentials, ttl_secs=credentials_ttl_secs)
+
+    def _setup_transport(self, credentials, pool_size=DEFAULT_HTTP_POOL_SIZE, timeout=DEFAULT_HTTP_TIMEOUT_SECS):
+        self._resources_pool = get_discovery_resources_pool(credentials, pool_size=pool_size, timeout=timeout)
+
+    def warm_up(self):
+        """Build a pooled discovery client ahead of the first API call"""
+        with self._resources_pool.acquire():
+            pass
+
+    def _api_call(self, resource_name, method_name, **kwargs):
+        if self._batcher and (resource_name, method_name) in BATCHABLE_API_METHODS:
+            call_fxn = functools.partial(self._batcher.call, resource_name, method_name, kwargs)
+        else:
+            call_fxn = functools.partial(self._execute, resource_name, method_name, kwargs)
+
+        # NOTE - Every attempt, including retries, counts against quota
+        def api_fxn():
+            quota.acquire(quota.API_DTS, f'{resource_name}.{method_name}')
+            return call_fxn()
+
+        with tracing.span(f'dts.{resource_name}.{method_name}'):
+            return self._retry_policy.call(api_fxn, resource_name, method_name)
+
+    def _execute(self, resource_name, method_name, kwargs):
+        with self._resources_pool.acquire() as resources:
+            api_fxn = getattr(resources.resources_by_name[resource_name], method_name)
+            api_request = api_fxn(**kwargs)
+            return api_request.execute()
+
+    def _execute_batch(self, pending_calls):
+        # https://developers.google.com/api-client-library/python/guide/batch
+        with self._resources_pool.acquire() as resources:
+            batch_request = resources.rest_client.new_batch_http_request()
+            for call_idx, pending_call in enumerate(pending_calls):
+                api_fxn = getattr(resources.resources_by_name[pending_call.resource_name], pending_call.method_name)
+                batch_request.add(api_fxn(**pending_call.kwargs), callback=pending_call.on_response,
+                                  request_id=str(call_idx))
+
+            with tracing.span('dts.batch', size=len(pending_calls)):
+                batch_request.execute()
 
     def _transfer_run_api_call(self, method_name, **kwargs):
         """
@@ -316,20 +847,13 @@ class PartnerDTSClient(object):
             run_id=self.run_id
         ).execute()
         """
-        api_prefix_fxn = self._rest_client.projects().locations().transferConfigs().runs()
-        api_fxn = getattr(api_prefix_fxn, method_name)
-        api_request = api_fxn(**kwargs)
-
-        return api_request.execute()
+        return self._api_call('runs', method_name, **kwargs)
 
     def enroll_data_sources(self, project_id=None, location_id=None, body=None):
-        base_api_fxn = self._rest_client.projects().locations().enrollDataSources(
-            name=f'projects/{project_id}/locations/{location_id}',
-            body=body
-        )
-        return base_api_fxn.execute()
+        return self._api_call('locations', 'enrollDataSources',
+                              name=f'projects/{project_id}/locations/{location_id}', body=body)
 
-    def get_credentials(self, location_id, data_source_id, user_id):
+    def get_credentials(self, location_id, data_source_id, user_id, force_refresh=False):
         """
         Get user authentication token so that the data source can perform
         operations on behalf of the user. Can only be called by configured
@@ -338,13 +862,26 @@ class PartnerDTSClient(object):
         :param location_id:
         :param data_source_id:
         :param user_id:
+        :param force_refresh: Skip the cached token, e.g. after it was rejected
         :return:
         """
+        if not self._credential_cache:
+            return self._fetch_credentials(location_id, data_source_id, user_id)
+
+        cache_key = (location_id, data_source_id, user_id)
+        if force_refresh:
+            self._credential_cache.invalidate(cache_key)
+        return self._credential_cache.get(cache_key)
+
+    def _fetch_credentials(self, location_id, data_source_id, user_id):
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rest/v1/projects.locations.dataSources.credentials/get
-        base_api_fxn = self._rest_client.projects().locations().dataSources().credentials().get(
+        return self._api_call('credentials', 'get',
             name='projects/-/locations/{}/dataSources/{}/credentials/{}'.format(location_id, data_source_id, user_id)
         )
-        return base_api_fxn.execute()
+
+    def transfer_run_get(self, transfer_run_name):
+        # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rest/v1/projects.locations.transferConfigs.runs/get
+        return self._transfer_run_api_call('get', name=transfer_run_name)
 
     def transfer_run_finish_run(self, transfer_run_name):
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rest/v1/projects.locations.transferConfigs.runs/finishRun
@@ -352,7 +889,8 @@ class PartnerDTSClient(object):
 
     def transfer_run_log_messages(self, transfer_run_name, body):
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rest/v1/projects.locations.transferConfigs.runs/logMessages
-        lg_body = copy.deepcopy(body)
+        # NOTE - Shallow copy, the builders below never mutate their inputs
+        lg_body = dict(body)
         lg_body['transferMessages'] = [TransferMessage(**current_msg) for current_msg in body['transferMessages']]
         return self._transfer_run_api_call('logMessages', name=transfer_run_name, body=lg_body)
 
@@ -367,16 +905,15 @@ class PartnerDTSClient(object):
     def transfer_run_start_big_query_jobs(self, transfer_run_name, body):
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rest/v1/projects.locations.transferConfigs.runs/startBigQueryJobs
 
-        start_jobs_body = copy.deepcopy(body)
-        start_jobs_body['importedData'] = [ImportedDataInfo(**current_idi) for current_idi in start_jobs_body['importedData']]
+        start_jobs_body = dict(body)
+        start_jobs_body['importedData'] = [
+            current_idi if isinstance(current_idi, ImportedDataInfoBody) else ImportedDataInfo(**current_idi)
+            for current_idi in body['importedData']
+        ]
         return self._transfer_run_api_call('startBigQueryJobs', name=transfer_run_name, body=start_jobs_body)
 
     def _data_source_definition_api_call(self, method_name, **kwargs):
-        base_api_fxn = self._rest_client.projects().locations().dataSourceDefinitions()
-        api_fxn = getattr(base_api_fxn, method_name)
-
-        api_request = api_fxn(**kwargs)
-        return api_request.execute()
+        return self._api_call('dataSourceDefinitions', method_name, **kwargs)
 
     def data_source_definition_create(self, project_id=None, location_id=None, body=None):
         # https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rest/v1/projects.locations.dataSourceDefinitions/create
@@ -412,3 +949,108 @@ class PartnerDTSClient(object):
             return f'projects/{project_id}/locations/{location_id}/dataSourceDefinitions/{data_source_id}'
 
         return f'projects/{project_id}/locations/{location_id}'
+
+
+##### BEGIN - Lean REST backend #####
+# Precompiled (HTTP method, URL template) for the partner methods used by PartnerDTSClient
+# https://cloud.google.com/bigquery/docs/reference/data-transfer/partner/rest/
+LEAN_API_METHODS = {
+    ('runs', 'finishRun'): ('POST', 'v1/{name}:finishRun'),
+    ('runs', 'get'): ('GET', 'v1/{name}'),
+    ('runs', 'logMessages'): ('POST', 'v1/{name}:logMessages'),
+    ('runs', 'patch'): ('PATCH', 'v1/{name}'),
+    ('runs', 'startBigQueryJobs'): ('POST', 'v1/{name}:startBigQueryJobs'),
+    ('dataSourceDefinitions', 'create'): ('POST', 'v1/{parent}/dataSourceDefinitions'),
+    ('dataSourceDefinitions', 'list'): ('GET', 'v1/{parent}/dataSourceDefinitions'),
+    ('dataSourceDefinitions', 'get'): ('GET', 'v1/{name}'),
+    ('dataSourceDefinitions', 'patch'): ('PATCH', 'v1/{name}'),
+    ('dataSourceDefinitions', 'delete'): ('DELETE', 'v1/{name}'),
+    ('credentials', 'get'): ('GET', 'v1/{name}'),
+    ('locations', 'enrollDataSources'): ('POST', 'v1/{name}:enrollDataSources'),
+}
+
+
+class _LeanApiMethod(object):
+    def __init__(self, http_method, path_template):
+        self.http_method = http_method
+        self.url_template = BQ_DTS_API_ROOT_URL + path_template
+        self.path_params = [field_name for _, field_name, _, _ in string.Formatter().parse(path_template) if field_name]
+
+    def build_request(self, kwargs):
+        # Equivalent to discovery's "{+name}" reserved expansion, path params keep their slashes
+        path_values = {param: parse.quote(kwargs[param], safe='/-') for param in self.path_params}
+        query_params = {
+            key: value for key, value in kwargs.items()
+            if key not in path_values and key != 'body' and value is not None
+        }
+        return self.url_template.format(**path_values), query_params, kwargs.get('body')
+
+LEAN_API_METHOD_MAP = {
+    method_key: _LeanApiMethod(http_method, path_template)
+    for method_key, (http_method, path_template) in LEAN_API_METHODS.items()
+}
+
+
+class LeanPartnerDTSClient(PartnerDTSClient):
+    """
+    PartnerDTSClient issuing requests directly through a pooled, authorized requests.Session
+
+    Skips importing and building the googleapiclient discovery client entirely.  Errors are raised as
+    googleapiclient.errors.HttpError so callers handle both backends identically.
+    """
+    def _setup_transport(self, credentials, pool_size=DEFAULT_HTTP_POOL_SIZE, timeout=DEFAULT_HTTP_TIMEOUT_SECS):
+        # NOTE - Deferred imports, only needed by this backend
+        import requests
+        from google.auth.transport import requests as google_auth_requests
+
+        self._timeout = timeout
+        # NOTE - Scope the credentials as the discovery client would, unscoped service account keys are rejected
+        scoped_credentials = google.auth.credentials.with_scopes_if_required(credentials, BQ_DTS_API_OAUTH_SCOPES)
+        self._session = google_auth_requests.AuthorizedSession(scoped_credentials)
+        self._transport_errors = (requests.ConnectionError, requests.Timeout)
+
+        # NOTE - requests.Session is safe to share across threads, pool_maxsize bounds keep-alive connections
+        http_adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount(BQ_DTS_API_ROOT_URL, http_adapter)
+
+    def warm_up(self):
+        # NOTE - Nothing to build, the session is ready once created
+        pass
+
+    def _execute(self, resource_name, method_name, kwargs):
+        api_method = LEAN_API_METHOD_MAP[(resource_name, method_name)]
+        url, query_params, body = api_method.build_request(kwargs)
+
+        try:
+            response = self._session.request(api_method.http_method, url, params=query_params, json=body,
+                                             timeout=self._timeout)
+        except self._transport_errors as transport_error:
+            # NOTE - Re-raised as the builtin ConnectionError so RetryPolicy treats both backends alike
+            raise ConnectionError(f'{api_method.http_method} {url} failed: {transport_error!r}') from transport_error
+        if response.status_code >= 400:
+            http_resp = httplib2.Response(dict(response.headers, status=response.status_code, reason=response.reason))
+            raise errors.HttpError(http_resp, response.content, uri=url)
+
+        return response.json() if response.content else dict()
+
+    def _execute_batch(self, pending_calls):
+        # NOTE - No multipart batch support, coalesced calls are sent back-to-back over keep-alive connections
+        for pending_call in pending_calls:
+            try:
+                result = self._execute(pending_call.resource_name, pending_call.method_name, pending_call.kwargs)
+            except Exception as call_error:
+                pending_call.on_response(None, None, call_error)
+            else:
+                pending_call.on_response(None, result, None)
+##### END - Lean REST backend #####
+
+
+class DTSBackend(Enum):
+    DISCOVERY = 'discovery'
+    LEAN = 'lean'
+
+
+DTS_BACKEND_TO_CLIENT_CLS_MAP = {
+    DTSBackend.DISCOVERY: PartnerDTSClient,
+    DTSBackend.LEAN: LeanPartnerDTSClient
+}
@@ -0,0 +1,307 @@
+# Copyright 2018 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Scheduling TransferRuns delivered via Pub/Sub, in front of BaseConnector.process_transfer_run
+"""
+
+import collections
+import contextlib
+import os
+import random
+import threading
+import time
+
+from bq_dts import helpers
+
+DEFAULT_COALESCE_MAX_RUNS = 16
+
+DEFAULT_COST_SECS = 60.0            # Assumed duration of a config's first run
+DEFAULT_COST_WEIGHT = 1.0
+DEFAULT_COST_EWMA_ALPHA = 0.3
+DEFAULT_FAIRNESS_SECS = 15 * 60.0   # Per run of the same user_id already running
+
+DEFAULT_ADMISSION_BACKOFF_SECS = 5.0
+DEFAULT_ADMISSION_MAX_BACKOFF_SECS = 60.0
+
+
+class _PendingItem(object):
+    def __init__(self, item):
+        self.item = item
+
+        self.result = None
+        self.error = None
+        self.is_done = threading.Event()
+
+    def on_result(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.is_done.set()
+
+
+class _Batch(object):
+    def __init__(self, key):
+        self.key = key
+        self.pending_items = list()
+        self.is_full = threading.Event()
+
+
+class RunCoalescer(object):
+    """
+    Groups items submitted under the same key, e.g. TransferRuns of one config_id, into one batch
+
+    The first submit() for a key opens a batch and waits up to window_secs (or until max_batch_size items joined),
+    then calls process_batch_fxn(items) on its own thread.  process_batch_fxn returns one result per item, in order.
+    Every caller blocks until its own result (or error) is fanned back out, so keep process_batch_fxn to the shared
+    work and let callers carry on with per-item work on their own threads.
+    """
+    def __init__(self, process_batch_fxn, window_secs, max_batch_size=DEFAULT_COALESCE_MAX_RUNS):
+        self.window_secs = window_secs
+        self.max_batch_size = max_batch_size
+
+        self._process_batch_fxn = process_batch_fxn
+        self._lock = threading.Lock()
+        self._open_batches = dict()
+
+    def submit(self, key, item):
+        pending_item = _PendingItem(item)
+
+        # Step 1 - Join the open batch for key, or open one and lead it
+        with self._lock:
+            current_batch = self._open_batches.get(key)
+            is_leader = current_batch is None
+            if is_leader:
+                current_batch = self._open_batches[key] = _Batch(key)
+
+            current_batch.pending_items.append(pending_item)
+            if len(current_batch.pending_items) >= self.max_batch_size:
+                self._close_batch(current_batch)
+
+        # Step 2 - The leader waits out the window, then processes the whole batch
+        if is_leader:
+            current_batch.is_full.wait(self.window_secs)
+            with self._lock:
+                self._close_batch(current_batch)
+
+            self._execute_batch(current_batch.pending_items)
+
+        # Step 3 - Wait for our result to be fanned back out
+        pending_item.is_done.wait()
+        if pending_item.error:
+            raise pending_item.error
+        return pending_item.result
+
+    def _close_batch(self, current_batch):
+        # NOTE - Caller must hold self._lock, later submits for the key open a new batch
+        if self._open_batches.get(current_batch.key) is current_batch:
+            del self._open_batches[current_batch.key]
+        current_batch.is_full.set()
+
+    def _execute_batch(self, pending_items):
+        try:
+            batch_results = self._process_batch_fxn([pending_item.item for pending_item in pending_items])
+            assert len(batch_results) == len(pending_items), 'process_batch_fxn must return one result per item'
+            for pending_item, item_result in zip(pending_items, batch_results):
+                pending_item.on_result(result=item_result)
+        except Exception as batch_error:
+            for pending_item in pending_items:
+                if not pending_item.is_done.is_set():
+                    pending_item.on_result(error=batch_error)
+        finally:
+            # Never leave a caller hanging
+            for pending_item in pending_items:
+                if not pending_item.is_done.is_set():
+                    pending_item.on_result(error=RuntimeError('No result in batch'))
+
+
+class _WaitingRun(object):
+    def __init__(self, config_id, user_id, deadline_ts):
+        self.config_id = config_id
+        self.user_id = user_id
+        self.deadline_ts = deadline_ts
+        self.arrival_ts = time.time()
+        self.is_scheduled = threading.Event()
+
+
+class PriorityScheduler(object):
+    """
+    Admits at most max_concurrent runs at a time, starting the most urgent waiting run whenever a slot frees up
+
+    Lower scores go first, re-computed on every pick:
+
+    score = (deadline_ts - now) + cost_weight * estimated_cost_secs + fairness_secs * runs_running_for_user_id
+
+    * Runs close to their BQ DTS update deadline jump the queue
+    * Cheap configs go before expensive ones, cost being an EWMA of earlier run durations per config_id
+    * A user_id with runs already in progress yields to other users
+    """
+    def __init__(self, max_concurrent, cost_weight=DEFAULT_COST_WEIGHT, fairness_secs=DEFAULT_FAIRNESS_SECS,
+                 default_cost_secs=DEFAULT_COST_SECS, cost_ewma_alpha=DEFAULT_COST_EWMA_ALPHA):
+        self.max_concurrent = max_concurrent
+        self.cost_weight = cost_weight
+        self.fairness_secs = fairness_secs
+        self.default_cost_secs = default_cost_secs
+        self.cost_ewma_alpha = cost_ewma_alpha
+
+        self._lock = threading.Lock()
+        self._waiting_runs = list()
+        self._running_count = 0
+        self._running_by_user = collections.Counter()
+        self._cost_secs_by_config = dict()
+
+    def estimated_cost_secs(self, config_id):
+        return self._cost_secs_by_config.get(config_id, self.default_cost_secs)
+
+    def score(self, waiting_run, current_ts):
+        slack_secs = waiting_run.deadline_ts - current_ts
+        cost_secs = self.estimated_cost_secs(waiting_run.config_id)
+        return (slack_secs + self.cost_weight * cost_secs
+                + self.fairness_secs * self._running_by_user[waiting_run.user_id])
+
+    @contextlib.contextmanager
+    def slot(self, config_id, user_id, deadline_ts):
+        """
+        Block until this run is picked, then hold a slot for the duration of the with-block
+
+        :param deadline_ts: Epoch seconds by which BQ DTS expects an update for this run
+        """
+        waiting_run = _WaitingRun(config_id, user_id, deadline_ts)
+        with self._lock:
+            self._waiting_runs.append(waiting_run)
+            self._schedule()
+
+        waiting_run.is_scheduled.wait()
+
+        time_start = time.time()
+        try:
+            yield waiting_run
+        finally:
+            with self._lock:
+                self._record_cost(config_id, time.time() - time_start)
+                self._running_count -= 1
+                self._running_by_user[user_id] -= 1
+                if not self._running_by_user[user_id]:
+                    del self._running_by_user[user_id]
+                self._schedule()
+
+    def _schedule(self):
+        # NOTE - Caller must hold self._lock
+        while self._waiting_runs and self._running_count < self.max_concurrent:
+            current_ts = time.time()
+            next_run = min(self._waiting_runs, key=lambda waiting_run: (self.score(waiting_run, current_ts),
+                                                                        waiting_run.arrival_ts))
+            self._waiting_runs.remove(next_run)
+
+            self._running_count += 1
+            self._running_by_user[next_run.user_id] += 1
+            next_run.is_scheduled.set()
+
+    def _record_cost(self, config_id, duration_secs):
+        previous_cost_secs = self._cost_secs_by_config.get(config_id)
+        if previous_cost_secs is None:
+            self._cost_secs_by_config[config_id] = duration_secs
+        else:
+            self._cost_secs_by_config[config_id] = (self.cost_ewma_alpha * duration_secs
+                                                    + (1.0 - self.cost_ewma_alpha) * previous_cost_secs)
+
+
+def available_memory_bytes():
+    """MemAvailable from /proc/meminfo, None where /proc is unavailable"""
+    try:
+        with open('/proc/meminfo') as meminfo_fp:
+            for meminfo_line in meminfo_fp:
+                if meminfo_line.startswith('MemAvailable:'):
+                    return int(meminfo_line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class AdmissionController(object):
+    """
+    Admits a new TransferRun only while this host has headroom, a 0 limit disables that check
+
+    * Free disk under local_dir >= min_free_disk_bytes
+    * Available memory >= min_free_memory_bytes
+    * 1-minute load average per CPU <= max_load_per_cpu
+    * Bytes being uploaded to GCS by this process <= max_upload_bytes
+
+    Rejections back off exponentially (with jitter) up to max_backoff_secs, reset by the next admitted run.  Callers
+    should back off while still holding the rejected work, so nothing new is taken on in the meantime.
+    """
+    def __init__(self, local_dir, min_free_disk_bytes=0, min_free_memory_bytes=0, max_load_per_cpu=0.0,
+                 max_upload_bytes=0, backoff_secs=DEFAULT_ADMISSION_BACKOFF_SECS,
+                 max_backoff_secs=DEFAULT_ADMISSION_MAX_BACKOFF_SECS, logger=None):
+        self.local_dir = local_dir
+        self.min_free_disk_bytes = min_free_disk_bytes
+        self.min_free_memory_bytes = min_free_memory_bytes
+        self.max_load_per_cpu = max_load_per_cpu
+        self.max_upload_bytes = max_upload_bytes
+        self.backoff_secs = backoff_secs
+        self.max_backoff_secs = max_backoff_secs
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._consecutive_rejections = 0
+
+    def check(self):
+        """
+        :return: Reasons there is no headroom, empty if a new run can be admitted
+        """
+        no_headroom_reasons = list()
+
+        if self.min_free_disk_bytes:
+            # NOTE - local_dir is only created by the first staged run
+            os.makedirs(self.local_dir, exist_ok=True)
+            local_dir_stats = os.statvfs(self.local_dir)
+            free_disk_bytes = local_dir_stats.f_bavail * local_dir_stats.f_frsize
+            if free_disk_bytes < self.min_free_disk_bytes:
+                no_headroom_reasons.append(f'disk {free_disk_bytes / helpers.BYTES_PER_MB:.0f}MB free')
+
+        if self.min_free_memory_bytes:
+            free_memory_bytes = available_memory_bytes()
+            if free_memory_bytes is not None and free_memory_bytes < self.min_free_memory_bytes:
+                no_headroom_reasons.append(f'memory {free_memory_bytes / helpers.BYTES_PER_MB:.0f}MB available')
+
+        if self.max_load_per_cpu:
+            load_per_cpu = os.getloadavg()[0] / (os.cpu_count() or 1)
+            if load_per_cpu > self.max_load_per_cpu:
+                no_headroom_reasons.append(f'load {load_per_cpu:.2f} per CPU')
+
+        if self.max_upload_bytes:
+            upload_bytes = helpers.inflight_upload_bytes()
+            if upload_bytes > self.max_upload_bytes:
+                no_headroom_reasons.append(f'uploads {upload_bytes / helpers.BYTES_PER_MB:.0f}MB in flight')
+
+        return no_headroom_reasons
+
+    def admit(self):
+        """
+        :return: (is_admitted, backoff_secs) - Wait backoff_secs before accepting more work when not admitted
+        """
+        no_headroom_reasons = self.check()
+        with self._lock:
+            if not no_headroom_reasons:
+                self._consecutive_rejections = 0
+                return True, 0.0
+
+            self._consecutive_rejections += 1
+            backoff_cap_secs = min(self.max_backoff_secs,
+                                   self.backoff_secs * (2 ** min(self._consecutive_rejections - 1, 16)))
+
+        if self.logger:
+            self.logger.warning(f'No headroom ; {", ".join(no_headroom_reasons)} ; Backing off')
+
+        # NOTE - Full jitter, so replicas rejecting at once do not retry in lock-step
+        return False, random.uniform(0.0, backoff_cap_secs)
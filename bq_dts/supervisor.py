@@ -0,0 +1,225 @@
+# Copyright 2018 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Pre-forked worker processes for BaseConnector, see --workers
+
+The supervisor forks after args and the connector config are processed, so every worker inherits the compiled
+config.  API clients are only created within workers - each worker has its own Pub/Sub subscriber and clients.
+
+* Worker log records are shipped to the supervisor over a multiprocessing queue and emitted by its handlers
+* Per-run metrics are shipped the same way and summarized every report_secs
+* Workers that exit - crashed, OOM-killed or otherwise - are restarted, backing off while they keep dying young
+"""
+
+import collections
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import random
+import signal
+import time
+
+DEFAULT_RESTART_BACKOFF_SECS = 1.0
+DEFAULT_MAX_RESTART_BACKOFF_SECS = 60.0
+DEFAULT_MIN_UPTIME_SECS = 30.0          # Workers exiting sooner count as crash-looping
+DEFAULT_REPORT_SECS = 60.0
+DEFAULT_POLL_SECS = 1.0
+DEFAULT_SHUTDOWN_SECS = 30.0
+
+
+def _worker_main(connector, worker_idx, log_queue, metrics_queue):
+    # Step 1 - Forked workers inherit the supervisor's signal handlers, replace them
+    # NOTE - SIGTERM drains in-flight runs, see BaseConnector.stop_serving.  SIGINT from a terminal also reaches the
+    # supervisor, which then SIGTERMs every worker
+    signal.signal(signal.SIGTERM, lambda signum, frame: connector.stop_serving())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Step 2 - Route every log record to the supervisor's handlers
+    root_logger = logging.getLogger()
+    for current_handler in list(root_logger.handlers):
+        root_logger.removeHandler(current_handler)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    # Step 3 - Forked workers otherwise share the supervisor's random state, e.g. retry jitter and profile sampling
+    random.seed()
+
+    # Step 4 - Serve Pub/Sub, reporting run metrics back to the supervisor
+    connector.worker_idx = worker_idx
+    connector.metrics_queue = metrics_queue
+    connector.serve()
+
+
+class _WorkerSlot(object):
+    def __init__(self, worker_idx):
+        self.worker_idx = worker_idx
+        self.process = None
+        self.time_started = None
+        self.restart_backoff_secs = 0.0
+        self.restart_at = 0.0
+
+
+class Supervisor(object):
+    def __init__(self, connector, num_workers, restart_backoff_secs=DEFAULT_RESTART_BACKOFF_SECS,
+                 max_restart_backoff_secs=DEFAULT_MAX_RESTART_BACKOFF_SECS, min_uptime_secs=DEFAULT_MIN_UPTIME_SECS,
+                 report_secs=DEFAULT_REPORT_SECS, shutdown_secs=DEFAULT_SHUTDOWN_SECS, logger=None):
+        self.connector = connector
+        self.num_workers = num_workers
+        self.restart_backoff_secs = restart_backoff_secs
+        self.max_restart_backoff_secs = max_restart_backoff_secs
+        self.min_uptime_secs = min_uptime_secs
+        self.report_secs = report_secs
+        self.shutdown_secs = shutdown_secs
+        self.logger = logger or logging.getLogger(__name__)
+
+        # NOTE - Fork, workers inherit the parsed args and compiled connector config
+        self._mp_ctx = multiprocessing.get_context('fork')
+        self._log_queue = self._mp_ctx.Queue()
+        self._metrics_queue = self._mp_ctx.Queue()
+        self._log_listener = None
+
+        self._worker_slots = [_WorkerSlot(worker_idx) for worker_idx in range(num_workers)]
+        self._is_stopping = False
+
+        self.metrics = dict(runs=0, runs_retried=0, run_secs=0.0, restarts=0,
+                            runs_by_worker=collections.Counter(), rss_hwm_mb_by_worker=dict())
+
+    def run(self):
+        # Step 1 - Emit worker log records through this process' handlers
+        root_handlers = logging.getLogger().handlers
+        self._log_listener = logging.handlers.QueueListener(self._log_queue, *root_handlers,
+                                                            respect_handler_level=True)
+        self._log_listener.start()
+
+        previous_handlers = {
+            signum: signal.signal(signum, self._on_signal) for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+        # Step 2 - Pre-fork workers
+        self.logger.info(f'Supervisor ; Starting {self.num_workers} workers')
+        for worker_slot in self._worker_slots:
+            self._start_worker(worker_slot)
+
+        # Step 3 - Restart exited workers, aggregate metrics, until signalled
+        time_last_report = time.time()
+        try:
+            while not self._is_stopping:
+                self._drain_metrics(DEFAULT_POLL_SECS)
+                self._check_workers()
+
+                if time.time() - time_last_report >= self.report_secs:
+                    self._report()
+                    time_last_report = time.time()
+        finally:
+            self.logger.info('Supervisor ; Stopping workers')
+            self._stop_workers()
+            self._drain_metrics(0.0)
+            self._report()
+
+            for signum, previous_handler in previous_handlers.items():
+                signal.signal(signum, previous_handler)
+            self._log_listener.stop()
+
+    def _on_signal(self, signum, frame):
+        # NOTE - Only set a flag, logging from a signal handler can deadlock on handler locks
+        self._is_stopping = True
+
+    ##### BEGIN - Worker lifecycle #####
+    def _start_worker(self, worker_slot):
+        worker_slot.process = self._mp_ctx.Process(
+            target=_worker_main, name=f'worker-{worker_slot.worker_idx}',
+            args=(self.connector, worker_slot.worker_idx, self._log_queue, self._metrics_queue))
+        worker_slot.process.start()
+        worker_slot.time_started = time.time()
+        self.logger.info(f'Supervisor ; worker-{worker_slot.worker_idx} started ; pid {worker_slot.process.pid}')
+
+    def _check_workers(self):
+        current_time = time.time()
+        for worker_slot in self._worker_slots:
+            # Step 1 - Waiting to restart a crash-looping worker
+            if worker_slot.process is None:
+                if current_time >= worker_slot.restart_at:
+                    self.metrics['restarts'] += 1
+                    self._start_worker(worker_slot)
+                continue
+
+            if worker_slot.process.is_alive():
+                continue
+
+            # Step 2 - Worker exited, a negative exit code is the signal that killed it, e.g. -9 from the OOM killer
+            exit_code = worker_slot.process.exitcode
+            uptime_secs = current_time - worker_slot.time_started
+            worker_slot.process.join()
+            worker_slot.process = None
+
+            # Step 3 - Back off exponentially while the worker keeps dying young
+            if uptime_secs < self.min_uptime_secs:
+                worker_slot.restart_backoff_secs = min(self.max_restart_backoff_secs,
+                                                       max(self.restart_backoff_secs, worker_slot.restart_backoff_secs * 2))
+            else:
+                worker_slot.restart_backoff_secs = 0.0
+            worker_slot.restart_at = current_time + worker_slot.restart_backoff_secs
+
+            self.logger.error(f'Supervisor ; worker-{worker_slot.worker_idx} exited ; exit code {exit_code} ; '
+                              f'uptime {uptime_secs:.1f}s ; Restarting in {worker_slot.restart_backoff_secs:.1f}s')
+
+    def _stop_workers(self):
+        live_processes = [worker_slot.process for worker_slot in self._worker_slots if worker_slot.process]
+        for current_process in live_processes:
+            current_process.terminate()
+
+        # NOTE - SIGTERMed workers stop taking messages and finish in-flight runs, kill stragglers after shutdown_secs
+        deadline = time.time() + self.shutdown_secs
+        for current_process in live_processes:
+            current_process.join(max(0.0, deadline - time.time()))
+            if current_process.is_alive():
+                self.logger.warning(f'Supervisor ; {current_process.name} did not stop, killing')
+                os.kill(current_process.pid, signal.SIGKILL)
+                current_process.join()
+    ##### END - Worker lifecycle #####
+
+    ##### BEGIN - Metrics #####
+    def _drain_metrics(self, timeout_secs):
+        # Block up to timeout_secs for the first run, then take whatever else is queued
+        try:
+            run_metrics = self._metrics_queue.get(timeout=timeout_secs)
+            while True:
+                self._record_run(run_metrics)
+                run_metrics = self._metrics_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _record_run(self, run_metrics):
+        self.metrics['runs'] += 1
+        self.metrics['runs_retried'] += int(bool(run_metrics.get('retry')))
+        self.metrics['run_secs'] += run_metrics.get('duration_secs') or 0.0
+        self.metrics['runs_by_worker'][run_metrics.get('worker_idx')] += 1
+
+        # NOTE - Highest per-run RSS high-water mark seen per worker, to spot workers close to the pod memory limit
+        rss_hwm_mb = run_metrics.get('rss_hwm_mb')
+        if rss_hwm_mb is not None:
+            worker_idx = run_metrics.get('worker_idx')
+            self.metrics['rss_hwm_mb_by_worker'][worker_idx] = max(
+                rss_hwm_mb, self.metrics['rss_hwm_mb_by_worker'].get(worker_idx, 0.0))
+
+    def _report(self):
+        live_workers = sum(1 for worker_slot in self._worker_slots if worker_slot.process and worker_slot.process.is_alive())
+        self.logger.info(f'Supervisor ; [METRICS] {live_workers}/{self.num_workers} workers alive ; '
+                         f'{self.metrics["runs"]} runs ({self.metrics["runs_retried"]} retried) ; '
+                         f'{self.metrics["run_secs"]:.1f} run secs ; {self.metrics["restarts"]} restarts ; '
+                         f'runs by worker {dict(self.metrics["runs_by_worker"])} ; '
+                         f'run RSS high-water mark MB by worker {self.metrics["rss_hwm_mb_by_worker"]}')
+    ##### END - Metrics #####
@@ -0,0 +1,393 @@
+# Copyright 2018 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Lightweight span tracing for TransferRuns, exported as local files - no collector service required
+
+Spans are only recorded once a Tracer is installed via set_tracer(), otherwise span() is a no-op.
+
+Example usage
+
+tracing.set_tracer(tracing.Tracer(tracing.FileExporter('/tmp/traces', tracing.TraceFormat.CHROME)))
+
+with tracing.TraceContext(run_name, 'transfer_run'):
+    with tracing.span('stage_table', table_name='date_greg'):
+        ...
+
+    # Propagate the trace to worker threads
+    executor.submit(tracing.wrap(upload_fxn), ...)
+
+tracing.get_tracer().export_trace(run_name, 'my_config.my_run')
+
+* CHROME - Chrome trace-event JSON, open with chrome://tracing or https://ui.perfetto.dev
+* OTLP - OpenTelemetry OTLP/JSON, ingest with "otel-cli" or any OTLP/JSON file receiver
+"""
+
+import collections
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+
+OTLP_SERVICE_NAME = 'bq-dts-partner-sdk'
+OTLP_SCOPE_NAME = 'bq_dts'
+OTLP_SPAN_KIND_INTERNAL = 1
+OTLP_STATUS_CODE_ERROR = 2
+
+DEFAULT_MAX_EXPORTED_TRACES = 1024   # Remembered so late spans, e.g. from a log flush timer, are dropped
+
+MICROSECONDS = 1000000
+NANOSECONDS = 1000000000
+
+
+class TraceFormat(object):
+    CHROME = 'chrome'
+    OTLP = 'otlp'
+
+
+TRACE_FORMAT_TO_FILE_SUFFIX = {
+    TraceFormat.CHROME: '.trace.json',
+    TraceFormat.OTLP: '.otlp.json'
+}
+
+_tracer = None
+_local = threading.local()
+
+
+def set_tracer(tracer):
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer():
+    return _tracer
+
+
+def _new_span_id():
+    return '%016x' % random.getrandbits(64)
+
+
+class Span(object):
+    __slots__ = ['name', 'trace_id', 'span_id', 'parent_id', 'attributes', 'time_start', 'time_end',
+                 'thread_id', 'thread_name', 'error']
+
+    def __init__(self, name, trace_id, parent_id, attributes):
+        current_thread = threading.current_thread()
+
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.time_start = time.time()
+        self.time_end = None
+        self.thread_id = current_thread.ident
+        self.thread_name = current_thread.name
+        self.error = None
+
+
+class _NoopSpanContext(object):
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+_NOOP_SPAN_CONTEXT = _NoopSpanContext()
+
+
+class _SpanContext(object):
+    def __init__(self, tracer, name, attributes):
+        self._tracer = tracer
+        self._name = name
+        self._attributes = attributes
+        self._span = None
+
+    def __enter__(self):
+        span_stack = _span_stack()
+        parent_id = span_stack[-1] if span_stack else getattr(_local, 'parent_id', None)
+
+        self._span = Span(self._name, _local.trace_id, parent_id, self._attributes)
+        span_stack.append(self._span.span_id)
+        return self._span
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._span.time_end = time.time()
+        if exc_val is not None:
+            self._span.error = repr(exc_val)
+
+        _span_stack().pop()
+        self._tracer.record(self._span)
+        return False
+
+
+def _span_stack():
+    span_stack = getattr(_local, 'span_stack', None)
+    if span_stack is None:
+        span_stack = _local.span_stack = list()
+    return span_stack
+
+
+def span(name, **attributes):
+    """
+    Context manager recording a Span under the current thread's trace
+
+    No-op unless a Tracer is installed AND the current thread is inside a trace()
+    """
+    if _tracer is None or getattr(_local, 'trace_id', None) is None:
+        return _NOOP_SPAN_CONTEXT
+
+    return _SpanContext(_tracer, name, attributes)
+
+
+def traced(name):
+    """Convenience decorator - Wraps the decorated function in span(name)"""
+    def fxn_wrapper(decorated_fxn):
+        @functools.wraps(decorated_fxn)
+        def wrapped_fxn(*args, **kwargs):
+            with span(name):
+                return decorated_fxn(*args, **kwargs)
+
+        return wrapped_fxn
+    return fxn_wrapper
+
+
+class trace(object):
+    """
+    Context manager attaching the current thread to trace_id, so span() calls are recorded
+
+    Re-entering the trace the current thread is already attached to is a no-op
+    """
+    def __init__(self, trace_id, parent_id=None):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+
+        self._is_reentrant = False
+        self._prev_trace_id = None
+        self._prev_parent_id = None
+        self._prev_span_stack = None
+
+    def __enter__(self):
+        self._is_reentrant = bool(getattr(_local, 'trace_id', None) == self.trace_id)
+        if self._is_reentrant:
+            return self
+
+        self._prev_trace_id = getattr(_local, 'trace_id', None)
+        self._prev_parent_id = getattr(_local, 'parent_id', None)
+        self._prev_span_stack = getattr(_local, 'span_stack', None)
+
+        _local.trace_id = self.trace_id
+        _local.parent_id = self.parent_id
+        _local.span_stack = list()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self._is_reentrant:
+            return False
+
+        _local.trace_id = self._prev_trace_id
+        _local.parent_id = self._prev_parent_id
+        _local.span_stack = self._prev_span_stack
+        return False
+
+
+class TraceContext(object):
+    """
+    Context manager attaching the current thread to trace_id AND opening a root span
+    """
+    def __init__(self, trace_id, root_span_name, **attributes):
+        self._trace = trace(trace_id)
+        self._root_span = None
+        self._root_span_name = root_span_name
+        self._attributes = attributes
+
+    def __enter__(self):
+        # NOTE - Re-open a trace exported earlier in this process, e.g. a redelivered TransferRun
+        if _tracer is not None:
+            _tracer.open_trace(self._trace.trace_id)
+
+        self._trace.__enter__()
+        self._root_span = span(self._root_span_name, **self._attributes)
+        return self._root_span.__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self._root_span.__exit__(exc_type, exc_val, exc_tb)
+        finally:
+            self._trace.__exit__(exc_type, exc_val, exc_tb)
+        return False
+
+
+def wrap(fxn):
+    """
+    Bind fxn to the caller's trace and current span, for use with threads and executors
+
+    executor.submit(tracing.wrap(fxn), *args)
+    """
+    trace_id = getattr(_local, 'trace_id', None)
+    if _tracer is None or trace_id is None:
+        return fxn
+
+    span_stack = _span_stack()
+    parent_id = span_stack[-1] if span_stack else getattr(_local, 'parent_id', None)
+
+    @functools.wraps(fxn)
+    def wrapped_fxn(*args, **kwargs):
+        with trace(trace_id, parent_id=parent_id):
+            return fxn(*args, **kwargs)
+
+    return wrapped_fxn
+
+
+class Tracer(object):
+    """
+    Collects finished Spans by trace_id until export_trace() hands them to the exporter
+
+    Spans finishing after their trace was popped are dropped, so they never pile up on a long-lived worker
+    """
+    def __init__(self, exporter=None, max_exported_traces=DEFAULT_MAX_EXPORTED_TRACES):
+        self.exporter = exporter
+        self.max_exported_traces = max_exported_traces
+
+        self._lock = threading.Lock()
+        self._spans_by_trace = collections.defaultdict(list)
+        self._exported_trace_ids = collections.OrderedDict()
+
+    def record(self, finished_span: Span):
+        with self._lock:
+            if finished_span.trace_id in self._exported_trace_ids:
+                return
+            self._spans_by_trace[finished_span.trace_id].append(finished_span)
+
+    def open_trace(self, trace_id):
+        with self._lock:
+            self._exported_trace_ids.pop(trace_id, None)
+
+    def pop_trace(self, trace_id):
+        with self._lock:
+            self._exported_trace_ids[trace_id] = True
+            while len(self._exported_trace_ids) > self.max_exported_traces:
+                self._exported_trace_ids.popitem(last=False)
+            return self._spans_by_trace.pop(trace_id, list())
+
+    def export_trace(self, trace_id, name):
+        spans = self.pop_trace(trace_id)
+        if not spans or not self.exporter:
+            return None
+
+        return self.exporter.export(spans, name)
+
+
+class FileExporter(object):
+    """
+    Writes each trace to {output_dir}/{name}{suffix} as Chrome trace-event JSON or OTLP/JSON
+    """
+    def __init__(self, output_dir, trace_format=TraceFormat.CHROME):
+        assert trace_format in TRACE_FORMAT_TO_FILE_SUFFIX
+
+        self.output_dir = output_dir
+        self.trace_format = trace_format
+
+    def export(self, spans, name):
+        os.makedirs(self.output_dir, exist_ok=True)
+        output_uri = os.path.join(self.output_dir, f'{name}{TRACE_FORMAT_TO_FILE_SUFFIX[self.trace_format]}')
+
+        if self.trace_format == TraceFormat.OTLP:
+            trace_body = spans_to_otlp_json(spans)
+        else:
+            trace_body = spans_to_chrome_trace(spans)
+
+        with open(output_uri, 'w') as trace_fp:
+            json.dump(trace_body, trace_fp, default=str)
+
+        return output_uri
+
+
+def spans_to_chrome_trace(spans):
+    # https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+    pid = os.getpid()
+
+    trace_events = list()
+    thread_names = dict()
+    for current_span in spans:
+        thread_names[current_span.thread_id] = current_span.thread_name
+
+        span_args = dict(current_span.attributes)
+        if current_span.error:
+            span_args['error'] = current_span.error
+
+        trace_events.append(dict(
+            name=current_span.name,
+            cat=OTLP_SCOPE_NAME,
+            ph='X',
+            ts=int(current_span.time_start * MICROSECONDS),
+            dur=int((current_span.time_end - current_span.time_start) * MICROSECONDS),
+            pid=pid,
+            tid=current_span.thread_id,
+            args=span_args
+        ))
+
+    for thread_id, thread_name in thread_names.items():
+        trace_events.append(dict(name='thread_name', ph='M', pid=pid, tid=thread_id, args=dict(name=thread_name)))
+
+    return dict(traceEvents=trace_events, displayTimeUnit='ms')
+
+
+def _otlp_attribute(key, value):
+    if isinstance(value, bool):
+        otlp_value = dict(boolValue=value)
+    elif isinstance(value, int):
+        otlp_value = dict(intValue=str(value))
+    elif isinstance(value, float):
+        otlp_value = dict(doubleValue=value)
+    else:
+        otlp_value = dict(stringValue=str(value))
+
+    return dict(key=key, value=otlp_value)
+
+
+def spans_to_otlp_json(spans):
+    # https://github.com/open-telemetry/opentelemetry-proto/blob/main/opentelemetry/proto/trace/v1/trace.proto
+    otlp_spans = list()
+    for current_span in spans:
+        # OTLP trace IDs are 16 bytes, derive one from our (string) trace_id
+        otlp_trace_id = hashlib.md5(str(current_span.trace_id).encode('utf-8')).hexdigest()
+
+        span_attributes = dict(current_span.attributes)
+        span_attributes['thread.id'] = current_span.thread_id
+        span_attributes['thread.name'] = current_span.thread_name
+
+        otlp_span = dict(
+            traceId=otlp_trace_id,
+            spanId=current_span.span_id,
+            name=current_span.name,
+            kind=OTLP_SPAN_KIND_INTERNAL,
+            startTimeUnixNano=str(int(current_span.time_start * NANOSECONDS)),
+            endTimeUnixNano=str(int(current_span.time_end * NANOSECONDS)),
+            attributes=[_otlp_attribute(key, value) for key, value in span_attributes.items()]
+        )
+        if current_span.parent_id:
+            otlp_span['parentSpanId'] = current_span.parent_id
+        if current_span.error:
+            otlp_span['status'] = dict(code=OTLP_STATUS_CODE_ERROR, message=current_span.error)
+
+        otlp_spans.append(otlp_span)
+
+    return dict(resourceSpans=[dict(
+        resource=dict(attributes=[_otlp_attribute('service.name', OTLP_SERVICE_NAME)]),
+        scopeSpans=[dict(scope=dict(name=OTLP_SCOPE_NAME), spans=otlp_spans)]
+    )])
@@ -0,0 +1,242 @@
+# Copyright 2018 Google LLC All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Persistent per-config watermarks, so table stagers can fetch only data newer than the last successful load
+
+Keyed by (config_id, table_key) - table_key is up to the stager, typically the ImportedDataInfo config name since
+table names change from run to run.  Values must be JSON-serializable, e.g. an ISO timestamp or a cursor.
+
+BQ DTS only runs the loads requested via startBigQueryJobs after a run finishes, so a run's watermarks are first
+added as unconfirmed under its run name, then confirmed - or dropped - once BQ DTS reports how the run ended.
+
+--watermark-store /var/lib/my_connector/watermarks.db      => SQLiteWatermarkStore
+--watermark-store gs://{gcs_bucket}/{blob_prefix}/         => GCSWatermarkStore, one object per config_id
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+from bq_dts import helpers
+from bq_dts import quota
+
+GCS_URI_PREFIX = 'gs://'
+GCS_MAX_UPDATE_ATTEMPTS = 10
+
+
+def is_gcs_store_uri(store_uri):
+    return store_uri.startswith(GCS_URI_PREFIX)
+
+
+class WatermarkStore(object):
+    def get(self, config_id, table_key):
+        """
+        :return: Last committed watermark, None if there is none
+        """
+        raise NotImplementedError
+
+    def set_many(self, config_id, watermarks):
+        """
+        Commit {table_key: watermark} for config_id
+        """
+        raise NotImplementedError
+
+    def add_unconfirmed(self, config_id, run_name, watermarks):
+        """
+        Hold {table_key: watermark} for run_name until confirm(), replacing any held for an earlier delivery
+        """
+        raise NotImplementedError
+
+    def list_unconfirmed(self, config_id):
+        """
+        :return: [(run_name, watermarks)] still waiting on confirm(), oldest first
+        """
+        raise NotImplementedError
+
+    def confirm(self, config_id, run_name, is_succeeded):
+        """
+        Commit run_name's unconfirmed watermarks if its loads succeeded, otherwise drop them
+        """
+        raise NotImplementedError
+
+
+class SQLiteWatermarkStore(WatermarkStore):
+    """
+    Local SQLite file, shared by every connector process on the host
+    """
+    CREATE_TABLE_SQL = """
+        CREATE TABLE IF NOT EXISTS watermarks (
+            config_id TEXT NOT NULL,
+            table_key TEXT NOT NULL,
+            watermark TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (config_id, table_key)
+        )
+    """
+    CREATE_UNCONFIRMED_TABLE_SQL = """
+        CREATE TABLE IF NOT EXISTS unconfirmed_watermarks (
+            config_id TEXT NOT NULL,
+            run_name TEXT NOT NULL,
+            watermarks TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (config_id, run_name)
+        )
+    """
+    SELECT_SQL = 'SELECT watermark FROM watermarks WHERE config_id = ? AND table_key = ?'
+    UPSERT_SQL = 'INSERT OR REPLACE INTO watermarks (config_id, table_key, watermark, updated_at) VALUES (?, ?, ?, ?)'
+
+    SELECT_UNCONFIRMED_SQL = 'SELECT run_name, watermarks FROM unconfirmed_watermarks WHERE config_id = ? ORDER BY rowid'
+    SELECT_UNCONFIRMED_RUN_SQL = 'SELECT watermarks FROM unconfirmed_watermarks WHERE config_id = ? AND run_name = ?'
+    UPSERT_UNCONFIRMED_SQL = ('INSERT OR REPLACE INTO unconfirmed_watermarks (config_id, run_name, watermarks, updated_at) '
+                              'VALUES (?, ?, ?, ?)')
+    DELETE_UNCONFIRMED_SQL = 'DELETE FROM unconfirmed_watermarks WHERE config_id = ? AND run_name = ?'
+
+    def __init__(self, db_uri):
+        self.db_uri = db_uri
+
+        self._lock = threading.Lock()
+        self._conn = None
+
+    @property
+    def conn(self):
+        if not self._conn:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_uri)), exist_ok=True)
+
+            # NOTE - One connection shared across threads, serialized by self._lock
+            self._conn = sqlite3.connect(self.db_uri, timeout=30.0, check_same_thread=False)
+            with self._conn:
+                self._conn.execute(self.CREATE_TABLE_SQL)
+                self._conn.execute(self.CREATE_UNCONFIRMED_TABLE_SQL)
+        return self._conn
+
+    def get(self, config_id, table_key):
+        with self._lock:
+            current_row = self.conn.execute(self.SELECT_SQL, (config_id, table_key)).fetchone()
+        return json.loads(current_row[0]) if current_row else None
+
+    def set_many(self, config_id, watermarks):
+        # NOTE - One transaction, a run's watermarks are committed all together or not at all
+        with self._lock, self.conn:
+            self._upsert(config_id, watermarks)
+
+    def _upsert(self, config_id, watermarks):
+        # NOTE - Caller must hold self._lock within a transaction
+        updated_at = datetime.datetime.utcnow().isoformat()
+        upsert_rows = [
+            (config_id, table_key, json.dumps(watermark), updated_at) for table_key, watermark in watermarks.items()
+        ]
+        self.conn.executemany(self.UPSERT_SQL, upsert_rows)
+
+    def add_unconfirmed(self, config_id, run_name, watermarks):
+        updated_at = datetime.datetime.utcnow().isoformat()
+        with self._lock, self.conn:
+            # NOTE - Delete first, so a redelivered run moves to the back of the line like a new insert
+            self.conn.execute(self.DELETE_UNCONFIRMED_SQL, (config_id, run_name))
+            self.conn.execute(self.UPSERT_UNCONFIRMED_SQL, (config_id, run_name, json.dumps(watermarks), updated_at))
+
+    def list_unconfirmed(self, config_id):
+        with self._lock:
+            current_rows = self.conn.execute(self.SELECT_UNCONFIRMED_SQL, (config_id,)).fetchall()
+        return [(run_name, json.loads(watermarks_str)) for run_name, watermarks_str in current_rows]
+
+    def confirm(self, config_id, run_name, is_succeeded):
+        with self._lock, self.conn:
+            current_row = self.conn.execute(self.SELECT_UNCONFIRMED_RUN_SQL, (config_id, run_name)).fetchone()
+            if not current_row:
+                return
+
+            if is_succeeded:
+                self._upsert(config_id, json.loads(current_row[0]))
+            self.conn.execute(self.DELETE_UNCONFIRMED_SQL, (config_id, run_name))
+
+
+class GCSWatermarkStore(WatermarkStore):
+    """
+    One JSON object per config at {gcs_prefix}/{config_id}.json
+
+    {"watermarks": {table_key: watermark}, "unconfirmed": [{"run_name": ..., "watermarks": {...}}, ...]}
+
+    Read-modify-write guarded by an ifGenerationMatch precondition, retried when another writer got there first
+    """
+    def __init__(self, gcs_client, gcs_prefix):
+        self.gcs_client = gcs_client
+        self.gcs_prefix = gcs_prefix.rstrip('/')
+
+    def _read_state(self, config_id):
+        """
+        :return: (state, generation) - generation 0 if the object does not exist yet
+        """
+        gcs_bucket, gcs_blob = helpers.parse_gcs_uri(f'{self.gcs_prefix}/{config_id}.json')
+        quota.acquire(quota.API_GCS, 'get_blob')
+        blob_obj = self.gcs_client.bucket(gcs_bucket).get_blob(gcs_blob)
+        if blob_obj is None:
+            return dict(watermarks=dict(), unconfirmed=list()), 0
+
+        # NOTE - Downloads via the blob's mediaLink, which pins the generation read above
+        quota.acquire(quota.API_GCS, 'download')
+        raw_state = json.loads(blob_obj.download_as_string().decode('utf-8'))
+        return dict(watermarks=raw_state.get('watermarks') or dict(),
+                    unconfirmed=raw_state.get('unconfirmed') or list()), blob_obj.generation
+
+    def _update_state(self, config_id, update_fxn):
+        for _ in range(GCS_MAX_UPDATE_ATTEMPTS):
+            config_state, generation = self._read_state(config_id)
+            if update_fxn(config_state) is False:
+                return
+
+            quota.acquire(quota.API_GCS, 'upload')
+            is_uploaded = helpers.upload_string_to_gcs_if_generation_match(
+                self.gcs_client, f'{self.gcs_prefix}/{config_id}.json',
+                json.dumps(config_state, sort_keys=True, indent=2), generation)
+            if is_uploaded:
+                return
+
+        raise RuntimeError(f'Watermarks for {config_id} kept changing, gave up after {GCS_MAX_UPDATE_ATTEMPTS} attempts')
+
+    def get(self, config_id, table_key):
+        config_state, _ = self._read_state(config_id)
+        return config_state['watermarks'].get(table_key)
+
+    def set_many(self, config_id, watermarks):
+        self._update_state(config_id, lambda config_state: config_state['watermarks'].update(watermarks))
+
+    def add_unconfirmed(self, config_id, run_name, watermarks):
+        def add_run(config_state):
+            config_state['unconfirmed'] = [
+                current_entry for current_entry in config_state['unconfirmed'] if current_entry['run_name'] != run_name
+            ]
+            config_state['unconfirmed'].append(dict(run_name=run_name, watermarks=watermarks))
+
+        self._update_state(config_id, add_run)
+
+    def list_unconfirmed(self, config_id):
+        config_state, _ = self._read_state(config_id)
+        return [(current_entry['run_name'], current_entry['watermarks']) for current_entry in config_state['unconfirmed']]
+
+    def confirm(self, config_id, run_name, is_succeeded):
+        def confirm_run(config_state):
+            run_entries = [
+                current_entry for current_entry in config_state['unconfirmed'] if current_entry['run_name'] == run_name
+            ]
+            if not run_entries:
+                return False
+
+            if is_succeeded:
+                config_state['watermarks'].update(run_entries[0]['watermarks'])
+            config_state['unconfirmed'].remove(run_entries[0])
+
+        self._update_state(config_id, confirm_run)
@@ -0,0 +1,86 @@
+import logging
+import os
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+from googleapiclient import errors
+
+from bq_dts import base_connector
+from bq_dts import rest_client
+from bq_dts import watermarks
+
+CONFIG_ID = 'config'
+RUN_NAME_FORMAT = 'projects/p/locations/us/transferConfigs/config/runs/{}'
+
+
+class ConfirmWatermarksTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = watermarks.SQLiteWatermarkStore(os.path.join(self.tmp_dir.name, 'watermarks.db'))
+
+        self.run_states = dict()
+        self.dts_client = mock.Mock()
+        self.dts_client.transfer_run_get.side_effect = self._transfer_run_get
+
+        self.connector = base_connector.BaseConnector.__new__(base_connector.BaseConnector)
+        self.connector._is_testing = False
+        self.connector._dts_client = self.dts_client
+        self.connector.logger = logging.getLogger(__name__)
+
+        self.run_ctx = types.SimpleNamespace(name=RUN_NAME_FORMAT.format('current'), config_id=CONFIG_ID,
+                                             watermark_store=self.store)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _transfer_run_get(self, run_name):
+        run_state = self.run_states[run_name]
+        if run_state == 404:
+            raise errors.HttpError(mock.Mock(status=404, reason='Not Found'), b'')
+        return dict(name=run_name, state=run_state)
+
+    def _add_run(self, run_id, run_state, watermark):
+        run_name = RUN_NAME_FORMAT.format(run_id)
+        self.run_states[run_name] = run_state
+        self.store.add_unconfirmed(CONFIG_ID, run_name, dict(table=watermark))
+        return run_name
+
+    def test_succeeded_is_committed(self):
+        self._add_run('ok', rest_client.TransferState.SUCCEEDED, 1)
+        self.connector.confirm_watermarks(self.run_ctx)
+
+        self.assertEqual(self.store.get(CONFIG_ID, 'table'), 1)
+        self.assertEqual(self.store.list_unconfirmed(CONFIG_ID), [])
+
+    def test_failed_cancelled_and_deleted_are_dropped(self):
+        self._add_run('failed', rest_client.TransferState.FAILED, 1)
+        self._add_run('cancelled', rest_client.TransferState.CANCELLED, 2)
+        self._add_run('deleted', 404, 3)
+        self.connector.confirm_watermarks(self.run_ctx)
+
+        self.assertIsNone(self.store.get(CONFIG_ID, 'table'))
+        self.assertEqual(self.store.list_unconfirmed(CONFIG_ID), [])
+
+    def test_stops_at_run_in_progress(self):
+        self._add_run('ok', rest_client.TransferState.SUCCEEDED, 1)
+        running_name = self._add_run('running', rest_client.TransferState.RUNNING, 2)
+        self._add_run('later', rest_client.TransferState.SUCCEEDED, 3)
+        self.connector.confirm_watermarks(self.run_ctx)
+
+        self.assertEqual(self.store.get(CONFIG_ID, 'table'), 1)
+        self.assertEqual([run_name for run_name, _ in self.store.list_unconfirmed(CONFIG_ID)],
+                         [running_name, RUN_NAME_FORMAT.format('later')])
+
+    def test_other_api_errors_are_raised(self):
+        run_name = self._add_run('error', rest_client.TransferState.SUCCEEDED, 1)
+        self.dts_client.transfer_run_get.side_effect = errors.HttpError(mock.Mock(status=500, reason='Error'), b'')
+
+        with self.assertRaises(errors.HttpError):
+            self.connector.confirm_watermarks(self.run_ctx)
+        self.assertEqual([name for name, _ in self.store.list_unconfirmed(CONFIG_ID)], [run_name])
+
+
+if __name__ == '__main__':
+    unittest.main()
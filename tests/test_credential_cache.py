@@ -0,0 +1,33 @@
+import unittest
+from unittest import mock
+
+from bq_dts import rest_client
+
+
+class CredentialCacheTest(unittest.TestCase):
+    def test_short_ttl_hit_does_not_refetch(self):
+        fetch_fxn = mock.Mock(return_value='token')
+        credential_cache = rest_client.CredentialCache(fetch_fxn, ttl_secs=60)
+
+        with mock.patch.object(rest_client.time, 'time', return_value=1000.0):
+            self.assertEqual(credential_cache.get(('us', 'ds', 'user')), 'token')
+        with mock.patch.object(rest_client.time, 'time', return_value=1030.0):
+            self.assertEqual(credential_cache.get(('us', 'ds', 'user')), 'token')
+
+        fetch_fxn.assert_called_once_with('us', 'ds', 'user')
+
+    def test_hit_close_to_expiry_refreshes_in_background(self):
+        fetch_fxn = mock.Mock(return_value='token')
+        credential_cache = rest_client.CredentialCache(fetch_fxn, ttl_secs=60)
+
+        with mock.patch.object(rest_client.time, 'time', return_value=1000.0):
+            credential_cache.get(('us', 'ds', 'user'))
+        with mock.patch.object(rest_client.threading, 'Thread') as thread_cls, \
+                mock.patch.object(rest_client.time, 'time', return_value=1050.0):
+            self.assertEqual(credential_cache.get(('us', 'ds', 'user')), 'token')
+
+        thread_cls.return_value.start.assert_called_once_with()
+
+
+if __name__ == '__main__':
+    unittest.main()